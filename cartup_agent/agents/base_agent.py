@@ -1,233 +1,388 @@
 """
 Base agent class with shared functionality for all CartUp agents
 Handles context handoff and agent transfers
+
+Prompt fragments and caches in this module are immutable and shared by every session;
+agent instances hold per-session chat state and must not be shared between sessions.
 """
 
+import functools
 import logging
-from typing import Tuple
+import sys
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from livekit.agents.llm import ChatContext, ChatItem
 from livekit.agents.voice import Agent
 
 from ..session.user_data import UserData, RunContext_T
-from ..config import get_tts_for_language
+from ..config import SUPPORTED_LANGUAGES, get_tts_for_language
+from ..tts_cache import cached_audio, prefetch
 
 logger = logging.getLogger("cartup-agent")
 
+# Fixed welcome message spoken on first entry; its audio is served from the TTS disk cache
+WELCOME_MESSAGES = {
+    "bn-BD": "স্বাগতম বাংলাদেশের নম্বর ওয়ান ই-কমার্স প্ল্যাটফর্ম কার্টআপে। আমি নাওমি, কার্টআপের কাস্টমার অ্যাসিস্ট্যান্ট। আমি আপনাকে কীভাবে সাহায্য করতে পারি?",
+    "en-IN": "Welcome to Bangladesh number one e-commerce platform CartUp. I'm Nawme, CartUp's Customer Assistant. How can I help you today?",
+}
+
+# Shared instruction fragments; agent prompts reuse these instead of repeating the text
+CHECK_CONTEXT_RULE = (
+    "Before asking for user_id or order_id, FIRST check the session summary (userdata) and last tool results. "
+    "If they are already present, do not re-ask and proceed.\n"
+)
+RESPOND_IN_LANGUAGE = {
+    "bn-BD": "IMPORTANT: Always respond in Bangladesh Bengali with authentic Bangladesh accent, pronunciation, and cultural context.\n",
+    "en-IN": "IMPORTANT: Always respond in English.",
+}
+
+
+@dataclass(frozen=True)
+class LangConfig:
+    """Everything an agent needs that depends on the session language."""
+    voice: str  # Google TTS voice name
+    tts_language: str  # TTS language code (bn-IN voices are used for bn-BD)
+    speaking_rate: float
+    instructions: str  # full agent instructions for this language
+    intro: str  # fixed phrase spoken first after a transfer
+    follow_up: str = ""  # generate_reply instructions after the intro, if any
+
+
+def _build_instruction_block(language: str, is_greeter: bool) -> str:
+    """Build the static (per language / agent kind) part of the on_enter system message."""
+    if language == "bn-BD":
+        lang_name = "Bengali (Bangladesh)"
+        lang_instructions = (
+            f"IMPORTANT: Respond in Bengali with Bangladesh accent and cultural context ({language}). "
+            f"The user has selected Bangladesh Bengali as their preferred language. "
+            f"Use Bangladesh Bengali pronunciation, vocabulary, and cultural references. "
+            f"All your responses must be in Bangladesh Bengali with authentic Bangladesh accent. "
+            f"When greeting users, use appropriate Bangladesh Bengali greetings like 'আসসালামু আলাইকুম' (Assalamu Alaikum) or 'নমস্কার' (Namaskar). "
+            f"Use Bangladesh-specific cultural references, vocabulary, and expressions throughout your responses.\n\n"
+            f"বাংলায় কথা বলার নির্দেশনা (Instructions for Speaking in Bengali):\n"
+            f"- প্রাকৃতিকভাবে কথা বলুন, যেন আপনি একজন বন্ধুত্বপূর্ণ বাংলাদেশি গ্রাহক সেবা প্রতিনিধি। "
+            f"কথা বলার সময় স্বাভাবিক, সহজ এবং বন্ধুত্বপূর্ণ ভাষা ব্যবহার করুন।\n"
+            f"- উচ্চারণ: বাংলাদেশি বাংলা উচ্চারণ ব্যবহার করুন। 'তুমি' বলুন 'তুমি' হিসেবে, 'আপনি' বলুন 'আপনি' হিসেবে। "
+            f"শব্দগুলো স্পষ্ট এবং প্রাকৃতিকভাবে উচ্চারণ করুন।\n"
+            f"- বাক্য গঠন: ছোট এবং সহজ বাক্য ব্যবহার করুন। দীর্ঘ এবং জটিল বাক্য এড়িয়ে চলুন। "
+            f"উদাহরণ: 'আপনার অর্ডার o302 বর্তমানে প্রক্রিয়াধীন আছে' - এটি ভাল। "
+            f"'আপনার অর্ডার যার আইডি হলো o302 এবং যেটি বর্তমানে আমাদের সিস্টেমে প্রক্রিয়াধীন অবস্থায় রয়েছে' - এটি খুব দীর্ঘ, এড়িয়ে চলুন।\n"
+            f"- সাধারণ অভিব্যক্তি ব্যবহার করুন: 'জি, অবশ্যই', 'আচ্ছা', 'ঠিক আছে', 'ধন্যবাদ', 'আপনাকে সাহায্য করতে পেরে খুশি হলাম' ইত্যাদি।\n"
+            f"- সংখ্যা এবং পরিমাণ: সংখ্যাগুলো বাংলায় বলুন। উদাহরণ: 'পাঁচ হাজার টাকা', 'তিনটি আইটেম', 'দুই দিন'।\n"
+            f"- TTS উচ্চারণের জন্য গুরুত্বপূর্ণ ফরম্যাটিং (CRITICAL for TTS pronunciation):\n"
+            f"  * কখনোই হাইফেন (-) ব্যবহার করবেন না। হাইফেনের পরিবর্তে স্পেস ব্যবহার করুন বা সরিয়ে দিন। "
+            f"উদাহরণ: 'o-302' নয়, বলুন 'o 302' বা 'o302'। 'user-id' নয়, বলুন 'user id' বা 'userid'।\n"
+            f"  * সংখ্যার পরে ডট (.) থাকলে, সেটি উচ্চারণ করবেন না। '1.' বলবেন 'এক' বা 'প্রথম' হিসেবে, '1 dot' নয়। "
+            f"'2.' বলবেন 'দুই' বা 'দ্বিতীয়' হিসেবে। উদাহরণ: 'আপনার 1 নম্বর অর্ডার' বা 'প্রথম অর্ডার', '1 dot' নয়।\n"
+            f"  * সংখ্যাগুলো বাংলায় উচ্চারণ করুন: '1' = 'এক', '2' = 'দুই', '3' = 'তিন', '10' = 'দশ', '100' = 'একশ', '1000' = 'এক হাজার'।\n"
+            f"  * অর্ডার আইডি বা আইডি বলার সময়: 'o-302' নয়, বলুন 'o 302' বা 'o তিনশ দুই'। 'u-101' নয়, বলুন 'u 101' বা 'u একশ এক'।\n"
+            f"- প্রশ্ন করার সময়: 'আপনার অর্ডার আইডি কী?' এর পরিবর্তে 'অর্ডার আইডি জানাবেন?' বা 'কোন অর্ডার নিয়ে জানতে চান?' "
+            f"এমন প্রাকৃতিক প্রশ্ন ব্যবহার করুন।\n"
+            f"- তথ্য দেওয়ার সময়: 'আপনার অর্ডার o302 বর্তমানে পেন্ডিং আছে' এর পরিবর্তে 'আপনার o302 নম্বর অর্ডারটি এখনো প্রক্রিয়াধীন আছে' "
+            f"এমন প্রাকৃতিকভাবে বলুন।\n"
+            f"- টাকা (Currency): সবসময় 'টাকা' বা 'tk' ব্যবহার করুন, 'রুপি' নয়। উদাহরণ: 'মোট পাঁচ হাজার টাকা' বা '৫০০০ tk'।\n"
+            f"- বন্ধুত্বপূর্ণ এবং সহায়ক হন: গ্রাহককে সাহায্য করতে ইচ্ছুক এবং বন্ধুত্বপূর্ণ ভাব প্রকাশ করুন। "
+            f"'আমি আপনাকে সাহায্য করতে পারি', 'চিন্তা করবেন না', 'আমি এখনই দেখে নিচ্ছি' ইত্যাদি ব্যবহার করুন।\n"
+            f"- প্রাকৃতিক কথোপকথন: যেন আপনি একজন বন্ধুর সাথে কথা বলছেন, কিন্তু সম্মানজনকভাবে। "
+            f"খুব আনুষ্ঠানিক বা খুব অনানুষ্ঠানিক হবেন না, মাঝামাঝি রাখুন।"
+        )
+    else:
+        lang_name = "English"
+        lang_instructions = (
+            f"IMPORTANT: Respond in {lang_name} ({language}). The user has selected {lang_name} as their preferred language. "
+            f"All your responses must be in {lang_name}."
+        )
+
+    # ID formatting instructions
+    id_formatting_instructions = (
+        "CRITICAL ID FORMATTING RULES:\n"
+        "- ALL IDs must be in LOWERCASE format: user_id (e.g., 'u101'), order_id (e.g., 'o302'), "
+        "ticket_id (e.g., 't602'), product_id (e.g., 'p001'), return order_id (e.g., 'o302').\n"
+        "- When users mention IDs verbally (e.g., 'o302', 'O302', 'O 302'), ALWAYS convert to lowercase "
+        "before calling tools (e.g., 'o302').\n"
+        "- If STT or transcription provides capitalized IDs (e.g., 'O302'), convert them to lowercase "
+        "immediately before using in tool calls.\n"
+        "- Database lookups are case-sensitive and will fail if IDs are not lowercase.\n"
+        "- If any bangla punctuation found, handle it appropriately to avoid errors. Don't mix English and Bangla punctuation in addresses.\n"
+    )
+
+    # Conversational response style instructions
+    if language == "bn-BD":
+        thank_you_branding = (
+            "" if is_greeter else (
+                "\nTHANK YOU RESPONSE - CRITICAL:\n"
+                "- When the user says 'thank you', 'thanks', 'ধন্যবাদ', 'থ্যাংক ইউ', or similar gratitude expressions, "
+                "ALWAYS respond with: 'আপনাকে স্বাগতম। বাংলাদেশের নম্বর ওয়ান ই-কমার্স প্ল্যাটফর্ম কার্টআপের সাথে থাকার জন্য ধন্যবাদ।' "
+                "(Translation: 'You're welcome. Thank you for staying with Bangladesh number one e-commerce platform CartUp.')\n"
+                "- Keep it natural and warm, but always include the branding message.\n"
+            )
+        )
+
+        # Scope limitation applies to ALL agents including GreeterAgent
+        scope_limitation = (
+            "\nSCOPE LIMITATION - CRITICAL:\n"
+            "- You are a CartUp e-commerce customer service assistant. You can ONLY help with:\n"
+            "  * Order tracking, status, and modifications\n"
+            "  * Support ticket creation and tracking\n"
+            "  * Returns and refunds\n"
+            "  * Product recommendations\n"
+            "  * General CartUp platform questions\n"
+            "- If the user asks for anything unrelated to e-commerce or CartUp (e.g., 'sing me a song', 'tell me a joke', "
+            "'play music', 'tell a story', 'what's the weather', 'general knowledge questions', etc.), "
+            "politely decline and redirect:\n"
+            "  * Bengali: 'আমি দুঃখিত, আমি শুধুমাত্র কার্টআপের অর্ডার, টিকেট, রিটার্ন এবং পণ্য সম্পর্কিত সাহায্য করতে পারি। "
+            "আপনাকে কীভাবে সাহায্য করতে পারি?' "
+            "(Translation: 'I'm sorry, I can only help with CartUp orders, tickets, returns, and products. How can I help you?')\n"
+            "- Be polite but firm - do not entertain non-e-commerce requests.\n"
+        )
+
+        conversational_instructions = (
+            "RESPONSE STYLE - CRITICAL:\n"
+            "- Start by introducing yourself to the user."
+            "- When presenting information from database queries or tool results, ALWAYS convert raw data into natural, conversational speech.\n"
+            "- Do NOT read out structured data verbatim (e.g., don't say 'order_id: o302, status: Pending').\n"
+            "- Instead, summarize and rephrase information as a friendly customer service agent would speak in Bangladesh Bengali.\n"
+            "- For example, instead of 'Order o302 has status: Pending, items: [item1, item2], amount: 100', "
+            "say 'আপনার o302 নম্বর অর্ডারটি এখনো প্রক্রিয়াধীন আছে। এতে [আইটেমের নাম] আছে এবং মোট ১০০ টাকা।'\n"
+            "- Always use 'টাকা' or 'tk' (Taka) as the currency unit, not 'rupee' or other currencies.\n"
+            "- Make responses sound natural and human-like, as if you're speaking directly to the customer in Bangladesh Bengali.\n"
+            "- Focus on the key information the customer cares about, not technical details.\n"
+            "- Avoid reading lists or dictionaries verbatim - summarize and present information conversationally in natural Bengali.\n"
+            "- Use natural Bengali expressions: 'জি, অবশ্যই', 'আচ্ছা', 'ঠিক আছে', 'ধন্যবাদ' etc.\n"
+            "- Speak in short, clear sentences. Avoid very long or complex sentences.\n"
+            "- CRITICAL TTS FORMATTING: Never use hyphens (-) in speech - replace with spaces or remove them. "
+            "Example: Say 'o 302' or 'o302', NOT 'o-302'. Say 'user id', NOT 'user-id'.\n"
+            "- CRITICAL TTS FORMATTING: When numbers have dots (like '1.'), speak them as Bengali words, NOT as '1 dot'. "
+            "Example: Say 'এক' (one) or 'প্রথম' (first) for '1.', NOT '1 dot'. Say 'দুই' (two) for '2.', NOT '2 dot'.\n"
+            "- CRITICAL TTS FORMATTING: Always spell out numbers in Bengali: '1' = 'এক', '2' = 'দুই', '10' = 'দশ', '100' = 'একশ', '1000' = 'এক হাজার'.\n"
+            f"{thank_you_branding}"
+            f"{scope_limitation}"
+        )
+    else:
+        thank_you_branding = (
+            "" if is_greeter else (
+                "\nTHANK YOU RESPONSE - CRITICAL:\n"
+                "- When the user says 'thank you', 'thanks', or similar gratitude expressions, "
+                "ALWAYS respond with: 'You're welcome. Thank you for staying with Bangladesh number one e-commerce platform CartUp.'\n"
+                "- Keep it natural and warm, but always include the branding message.\n"
+            )
+        )
+
+        # Scope limitation applies to ALL agents including GreeterAgent
+        scope_limitation = (
+            "\nSCOPE LIMITATION - CRITICAL:\n"
+            "- You are a CartUp e-commerce customer service agent. You can ONLY help with:\n"
+            "  * Order tracking, status, and modifications\n"
+            "  * Support ticket creation and tracking\n"
+            "  * Returns and refunds\n"
+            "  * Product recommendations\n"
+            "  * General CartUp platform questions\n"
+            "- If the user asks for anything unrelated to e-commerce or CartUp (e.g., 'sing me a song', 'tell me a joke', "
+            "'play music', 'tell a story', 'what's the weather', 'general knowledge questions', etc.), "
+            "politely decline and redirect:\n"
+            "  * English: 'I'm sorry, I can only help with CartUp orders, tickets, returns, and products. How can I help you?'\n"
+            "- Be polite but firm - do not entertain non-e-commerce requests.\n"
+        )
+
+        conversational_instructions = (
+            "RESPONSE STYLE - CRITICAL:\n"
+            "- When presenting information from database queries or tool results, ALWAYS convert raw data into natural, conversational speech.\n"
+            "- Do NOT read out structured data verbatim (e.g., don't say 'order_id: o302, status: Pending').\n"
+            "- Instead, summarize and rephrase information as a friendly customer service agent would speak.\n"
+            "- For example, instead of 'Order o302 has status: Pending, items: [item1, item2], amount: 100', "
+            "say 'Your order o302 is currently pending. It includes [item names] and the total is 100 tk.'\n"
+            "- Always use 'tk' (Taka) as the currency unit, not 'rupee' or other currencies.\n"
+            "- Make responses sound natural and human-like, as if you're speaking directly to the customer.\n"
+            "- Focus on the key information the customer cares about, not technical details.\n"
+            "- Avoid reading lists or dictionaries verbatim - summarize and present information conversationally.\n"
+            f"{thank_you_branding}"
+            f"{scope_limitation}"
+        )
+
+    return (
+        f"{id_formatting_instructions}\n"
+        f"{conversational_instructions}\n"
+        f"{lang_instructions}"
+    )
+
+
+# Static instruction tails keyed by (language, is_greeter), built once at import
+_INSTRUCTION_CACHE: Dict[Tuple[str, bool], str] = {
+    (language, is_greeter): _build_instruction_block(language, is_greeter)
+    for language in SUPPORTED_LANGUAGES
+    for is_greeter in (False, True)
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _build_system_content(agent_name: str, language: str, is_greeter: bool, summary: str) -> str:
+    """Return the on_enter system message, reusing the same string for unchanged summaries."""
+    tail = _INSTRUCTION_CACHE.get((language, is_greeter))
+    if tail is None:
+        tail = _INSTRUCTION_CACHE.setdefault(
+            (language, is_greeter), _build_instruction_block(language, is_greeter)
+        )
+    # A single f-string compiles to one BUILD_STRING: the tail is copied once and never
+    # scanned for placeholders (string.Template / % formatting would scan all of it).
+    # The per-session summary goes last so the static block stays in the cached prompt prefix.
+    return f"You are {agent_name}.\n\n{tail}\n\nCurrent session summary:\n{summary}"
+
+
+# Interned transfer announcements, one per target agent key
+_TRANSFER_MSGS: Dict[str, str] = {}
+
+
+def _transfer_msg(name: str) -> str:
+    """Return the (interned) transfer announcement for the target agent key."""
+    msg = _TRANSFER_MSGS.get(name)
+    if msg is None:
+        msg = _TRANSFER_MSGS[name] = sys.intern(f"Transferring to {name}.")
+    return msg
+
+
+def _is_instruction(item: ChatItem) -> bool:
+    return item.type == "message" and item.role in ("system", "developer")
+
+
+def _bounded_history(items: List[ChatItem], max_items: int, head: int = 2) -> List[ChatItem]:
+    """
+    Return at most `max_items` non-instruction items: the first `head` messages (which
+    usually state the user's intent) plus the most recent items, dropping the middle.
+
+    Only the ends of the history are scanned, so the cost does not grow with the session.
+    The head stays identical across handoffs, which keeps the prompt prefix cacheable.
+    """
+    # Head: the opening messages, stopping at the first tool call so it stays self-contained
+    head_items: List[ChatItem] = []
+    head_end = 0
+    for idx, item in enumerate(items):
+        if len(head_items) >= min(head, max_items) or item.type != "message":
+            break
+        head_end = idx + 1
+        if not _is_instruction(item):
+            head_items.append(item)
+
+    # Tail: scan back from the end, never past the head
+    tail_size = max_items - len(head_items)
+    recent: deque = deque()
+    truncated = False
+    for idx in range(len(items) - 1, head_end - 1, -1):
+        item = items[idx]
+        if _is_instruction(item):
+            continue
+        if len(recent) == tail_size:
+            truncated = True
+            break
+        recent.appendleft(item)
+
+    # chat ctx shouldn't resume with a function_call or function_call_output
+    while truncated and recent and recent[0].type in ("function_call", "function_call_output"):
+        recent.popleft()
+    return head_items + list(recent)
+
 
 class BaseAgent(Agent):
-    """Base class for all CartUp agents with shared functionality."""
+    """
+    Base class for all CartUp agents with shared functionality.
+
+    Instances carry mutable per-session state (chat_ctx, activity) and are not safe to
+    share: create one set of agents per AgentSession, as main.entrypoint does.
+    """
+    
+    # Set on first on_enter; entering from a different session is rejected
+    _owner_session = None
+    
+    # Handoff settings; subclasses override these instead of re-implementing on_enter
+    history_max_items: int = 10  # previous-agent items carried over on transfer
+    history_head_items: int = 2  # of those, opening messages always kept
+    include_thank_you: bool = True  # add the branded thank-you rule to the system message
     
     async def on_enter(self) -> None:
         """Called when agent becomes active. Handles context handoff."""
         agent_name = self.__class__.__name__
         logger.info(f"Entering {agent_name}")
         
-        userdata: UserData = self.session.userdata
-        chat_ctx = self.chat_ctx.copy()
+        # Bind the attributes used repeatedly below to locals once
+        session = self.session
+        if self._owner_session is None:
+            self._owner_session = session
+        elif self._owner_session is not session:
+            raise RuntimeError(
+                f"{agent_name} is already bound to another AgentSession; "
+                "create a new agent instance per session"
+            )
+        
+        userdata: UserData = session.userdata
+        prev_agent = userdata.prev_agent
         
         # Get language preference (default to English if not set)
         language = userdata.language or "en-IN"
         logger.info(f"[{agent_name}] Language preference: {language} (from userdata.language: {userdata.language})")
         
+        # Initial greeting for first agent (GreeterAgent). It is a fixed phrase that does not
+        # depend on chat history, so start playing it before the context is assembled.
+        if prev_agent is None:
+            self._say_cached(WELCOME_MESSAGES.get(language, WELCOME_MESSAGES["en-IN"]))
+        
+        # On the very first entry there is nothing to keep (update_chat_ctx re-adds
+        # the instructions)
+        if prev_agent is None:
+            chat_ctx = ChatContext.empty()
+        else:
+            chat_ctx = self.chat_ctx.copy()
+        
         # Note: Agent's TTS is read-only and set during initialization.
         # The session-level TTS will be used, and we configure language-aware TTS
         # by ensuring the agent's instructions include language context.
         # For future enhancement, we could update session.tts if supported.
         
         # Copy truncated chat history from previous agent
-        if isinstance(userdata.prev_agent, Agent):
-            truncated_chat_ctx = userdata.prev_agent.chat_ctx.copy(
-                exclude_instructions=True,
-                exclude_function_call=False
-            ).truncate(max_items=10)
-            
-            existing_ids = {item.id for item in chat_ctx.items}
-            items_copy = [
-                item for item in truncated_chat_ctx.items
-                if item.id not in existing_ids
-            ]
-            chat_ctx.items.extend(items_copy)
-        
-        # Inject live summary for fast grounding with language context
-        if language == "bn-BD":
-            lang_name = "Bengali (Bangladesh)"
-            lang_instructions = (
-                f"IMPORTANT: Respond in Bengali with Bangladesh accent and cultural context ({language}). "
-                f"The user has selected Bangladesh Bengali as their preferred language. "
-                f"Use Bangladesh Bengali pronunciation, vocabulary, and cultural references. "
-                f"All your responses must be in Bangladesh Bengali with authentic Bangladesh accent. "
-                f"When greeting users, use appropriate Bangladesh Bengali greetings like 'আসসালামু আলাইকুম' (Assalamu Alaikum) or 'নমস্কার' (Namaskar). "
-                f"Use Bangladesh-specific cultural references, vocabulary, and expressions throughout your responses.\n\n"
-                f"বাংলায় কথা বলার নির্দেশনা (Instructions for Speaking in Bengali):\n"
-                f"- প্রাকৃতিকভাবে কথা বলুন, যেন আপনি একজন বন্ধুত্বপূর্ণ বাংলাদেশি গ্রাহক সেবা প্রতিনিধি। "
-                f"কথা বলার সময় স্বাভাবিক, সহজ এবং বন্ধুত্বপূর্ণ ভাষা ব্যবহার করুন।\n"
-                f"- উচ্চারণ: বাংলাদেশি বাংলা উচ্চারণ ব্যবহার করুন। 'তুমি' বলুন 'তুমি' হিসেবে, 'আপনি' বলুন 'আপনি' হিসেবে। "
-                f"শব্দগুলো স্পষ্ট এবং প্রাকৃতিকভাবে উচ্চারণ করুন।\n"
-                f"- বাক্য গঠন: ছোট এবং সহজ বাক্য ব্যবহার করুন। দীর্ঘ এবং জটিল বাক্য এড়িয়ে চলুন। "
-                f"উদাহরণ: 'আপনার অর্ডার o302 বর্তমানে প্রক্রিয়াধীন আছে' - এটি ভাল। "
-                f"'আপনার অর্ডার যার আইডি হলো o302 এবং যেটি বর্তমানে আমাদের সিস্টেমে প্রক্রিয়াধীন অবস্থায় রয়েছে' - এটি খুব দীর্ঘ, এড়িয়ে চলুন।\n"
-                f"- সাধারণ অভিব্যক্তি ব্যবহার করুন: 'জি, অবশ্যই', 'আচ্ছা', 'ঠিক আছে', 'ধন্যবাদ', 'আপনাকে সাহায্য করতে পেরে খুশি হলাম' ইত্যাদি।\n"
-                f"- সংখ্যা এবং পরিমাণ: সংখ্যাগুলো বাংলায় বলুন। উদাহরণ: 'পাঁচ হাজার টাকা', 'তিনটি আইটেম', 'দুই দিন'।\n"
-                f"- TTS উচ্চারণের জন্য গুরুত্বপূর্ণ ফরম্যাটিং (CRITICAL for TTS pronunciation):\n"
-                f"  * কখনোই হাইফেন (-) ব্যবহার করবেন না। হাইফেনের পরিবর্তে স্পেস ব্যবহার করুন বা সরিয়ে দিন। "
-                f"উদাহরণ: 'o-302' নয়, বলুন 'o 302' বা 'o302'। 'user-id' নয়, বলুন 'user id' বা 'userid'।\n"
-                f"  * সংখ্যার পরে ডট (.) থাকলে, সেটি উচ্চারণ করবেন না। '1.' বলবেন 'এক' বা 'প্রথম' হিসেবে, '1 dot' নয়। "
-                f"'2.' বলবেন 'দুই' বা 'দ্বিতীয়' হিসেবে। উদাহরণ: 'আপনার 1 নম্বর অর্ডার' বা 'প্রথম অর্ডার', '1 dot' নয়।\n"
-                f"  * সংখ্যাগুলো বাংলায় উচ্চারণ করুন: '1' = 'এক', '2' = 'দুই', '3' = 'তিন', '10' = 'দশ', '100' = 'একশ', '1000' = 'এক হাজার'।\n"
-                f"  * অর্ডার আইডি বা আইডি বলার সময়: 'o-302' নয়, বলুন 'o 302' বা 'o তিনশ দুই'। 'u-101' নয়, বলুন 'u 101' বা 'u একশ এক'।\n"
-                f"- প্রশ্ন করার সময়: 'আপনার অর্ডার আইডি কী?' এর পরিবর্তে 'অর্ডার আইডি জানাবেন?' বা 'কোন অর্ডার নিয়ে জানতে চান?' "
-                f"এমন প্রাকৃতিক প্রশ্ন ব্যবহার করুন।\n"
-                f"- তথ্য দেওয়ার সময়: 'আপনার অর্ডার o302 বর্তমানে পেন্ডিং আছে' এর পরিবর্তে 'আপনার o302 নম্বর অর্ডারটি এখনো প্রক্রিয়াধীন আছে' "
-                f"এমন প্রাকৃতিকভাবে বলুন।\n"
-                f"- টাকা (Currency): সবসময় 'টাকা' বা 'tk' ব্যবহার করুন, 'রুপি' নয়। উদাহরণ: 'মোট পাঁচ হাজার টাকা' বা '৫০০০ tk'।\n"
-                f"- বন্ধুত্বপূর্ণ এবং সহায়ক হন: গ্রাহককে সাহায্য করতে ইচ্ছুক এবং বন্ধুত্বপূর্ণ ভাব প্রকাশ করুন। "
-                f"'আমি আপনাকে সাহায্য করতে পারি', 'চিন্তা করবেন না', 'আমি এখনই দেখে নিচ্ছি' ইত্যাদি ব্যবহার করুন।\n"
-                f"- প্রাকৃতিক কথোপকথন: যেন আপনি একজন বন্ধুর সাথে কথা বলছেন, কিন্তু সম্মানজনকভাবে। "
-                f"খুব আনুষ্ঠানিক বা খুব অনানুষ্ঠানিক হবেন না, মাঝামাঝি রাখুন।"
-            )
-        else:
-            lang_name = "English"
-            lang_instructions = (
-                f"IMPORTANT: Respond in {lang_name} ({language}). The user has selected {lang_name} as their preferred language. "
-                f"All your responses must be in {lang_name}."
-            )
-        
-        # ID formatting instructions
-        id_formatting_instructions = (
-            "CRITICAL ID FORMATTING RULES:\n"
-            "- ALL IDs must be in LOWERCASE format: user_id (e.g., 'u101'), order_id (e.g., 'o302'), "
-            "ticket_id (e.g., 't602'), product_id (e.g., 'p001'), return order_id (e.g., 'o302').\n"
-            "- When users mention IDs verbally (e.g., 'o302', 'O302', 'O 302'), ALWAYS convert to lowercase "
-            "before calling tools (e.g., 'o302').\n"
-            "- If STT or transcription provides capitalized IDs (e.g., 'O302'), convert them to lowercase "
-            "immediately before using in tool calls.\n"
-            "- Database lookups are case-sensitive and will fail if IDs are not lowercase.\n"
-            "- If any bangla punctuation found, handle it appropriately to avoid errors. Don't mix English and Bangla punctuation in addresses.\n"
-        )
-        
-        # Conversational response style instructions
-        # Check if this is GreeterAgent (exclude from thank you branding)
-        is_greeter = agent_name == "GreeterAgent"
-        
-        if language == "bn-BD":
-            thank_you_branding = (
-                "" if is_greeter else (
-                    "\nTHANK YOU RESPONSE - CRITICAL:\n"
-                    "- When the user says 'thank you', 'thanks', 'ধন্যবাদ', 'থ্যাংক ইউ', or similar gratitude expressions, "
-                    "ALWAYS respond with: 'আপনাকে স্বাগতম। বাংলাদেশের নম্বর ওয়ান ই-কমার্স প্ল্যাটফর্ম কার্টআপের সাথে থাকার জন্য ধন্যবাদ।' "
-                    "(Translation: 'You're welcome. Thank you for staying with Bangladesh number one e-commerce platform CartUp.')\n"
-                    "- Keep it natural and warm, but always include the branding message.\n"
-                )
-            )
-            
-            # Scope limitation applies to ALL agents including GreeterAgent
-            scope_limitation = (
-                "\nSCOPE LIMITATION - CRITICAL:\n"
-                "- You are a CartUp e-commerce customer service assistant. You can ONLY help with:\n"
-                "  * Order tracking, status, and modifications\n"
-                "  * Support ticket creation and tracking\n"
-                "  * Returns and refunds\n"
-                "  * Product recommendations\n"
-                "  * General CartUp platform questions\n"
-                "- If the user asks for anything unrelated to e-commerce or CartUp (e.g., 'sing me a song', 'tell me a joke', "
-                "'play music', 'tell a story', 'what's the weather', 'general knowledge questions', etc.), "
-                "politely decline and redirect:\n"
-                "  * Bengali: 'আমি দুঃখিত, আমি শুধুমাত্র কার্টআপের অর্ডার, টিকেট, রিটার্ন এবং পণ্য সম্পর্কিত সাহায্য করতে পারি। "
-                "আপনাকে কীভাবে সাহায্য করতে পারি?' "
-                "(Translation: 'I'm sorry, I can only help with CartUp orders, tickets, returns, and products. How can I help you?')\n"
-                "- Be polite but firm - do not entertain non-e-commerce requests.\n"
-            )
-            
-            conversational_instructions = (
-                "RESPONSE STYLE - CRITICAL:\n"
-                "- Start by introducing yourself to the user."
-                "- When presenting information from database queries or tool results, ALWAYS convert raw data into natural, conversational speech.\n"
-                "- Do NOT read out structured data verbatim (e.g., don't say 'order_id: o302, status: Pending').\n"
-                "- Instead, summarize and rephrase information as a friendly customer service agent would speak in Bangladesh Bengali.\n"
-                "- For example, instead of 'Order o302 has status: Pending, items: [item1, item2], amount: 100', "
-                "say 'আপনার o302 নম্বর অর্ডারটি এখনো প্রক্রিয়াধীন আছে। এতে [আইটেমের নাম] আছে এবং মোট ১০০ টাকা।'\n"
-                "- Always use 'টাকা' or 'tk' (Taka) as the currency unit, not 'rupee' or other currencies.\n"
-                "- Make responses sound natural and human-like, as if you're speaking directly to the customer in Bangladesh Bengali.\n"
-                "- Focus on the key information the customer cares about, not technical details.\n"
-                "- Avoid reading lists or dictionaries verbatim - summarize and present information conversationally in natural Bengali.\n"
-                "- Use natural Bengali expressions: 'জি, অবশ্যই', 'আচ্ছা', 'ঠিক আছে', 'ধন্যবাদ' etc.\n"
-                "- Speak in short, clear sentences. Avoid very long or complex sentences.\n"
-                "- CRITICAL TTS FORMATTING: Never use hyphens (-) in speech - replace with spaces or remove them. "
-                "Example: Say 'o 302' or 'o302', NOT 'o-302'. Say 'user id', NOT 'user-id'.\n"
-                "- CRITICAL TTS FORMATTING: When numbers have dots (like '1.'), speak them as Bengali words, NOT as '1 dot'. "
-                "Example: Say 'এক' (one) or 'প্রথম' (first) for '1.', NOT '1 dot'. Say 'দুই' (two) for '2.', NOT '2 dot'.\n"
-                "- CRITICAL TTS FORMATTING: Always spell out numbers in Bengali: '1' = 'এক', '2' = 'দুই', '10' = 'দশ', '100' = 'একশ', '1000' = 'এক হাজার'.\n"
-                f"{thank_you_branding}"
-                f"{scope_limitation}"
-            )
-        else:
-            thank_you_branding = (
-                "" if is_greeter else (
-                    "\nTHANK YOU RESPONSE - CRITICAL:\n"
-                    "- When the user says 'thank you', 'thanks', or similar gratitude expressions, "
-                    "ALWAYS respond with: 'You're welcome. Thank you for staying with Bangladesh number one e-commerce platform CartUp.'\n"
-                    "- Keep it natural and warm, but always include the branding message.\n"
-                )
-            )
-            
-            # Scope limitation applies to ALL agents including GreeterAgent
-            scope_limitation = (
-                "\nSCOPE LIMITATION - CRITICAL:\n"
-                "- You are a CartUp e-commerce customer service agent. You can ONLY help with:\n"
-                "  * Order tracking, status, and modifications\n"
-                "  * Support ticket creation and tracking\n"
-                "  * Returns and refunds\n"
-                "  * Product recommendations\n"
-                "  * General CartUp platform questions\n"
-                "- If the user asks for anything unrelated to e-commerce or CartUp (e.g., 'sing me a song', 'tell me a joke', "
-                "'play music', 'tell a story', 'what's the weather', 'general knowledge questions', etc.), "
-                "politely decline and redirect:\n"
-                "  * English: 'I'm sorry, I can only help with CartUp orders, tickets, returns, and products. How can I help you?'\n"
-                "- Be polite but firm - do not entertain non-e-commerce requests.\n"
+        if isinstance(prev_agent, Agent):
+            recent_items = _bounded_history(
+                prev_agent.chat_ctx.items,
+                max_items=self.history_max_items,
+                head=self.history_head_items,
             )
             
-            conversational_instructions = (
-                "RESPONSE STYLE - CRITICAL:\n"
-                "- When presenting information from database queries or tool results, ALWAYS convert raw data into natural, conversational speech.\n"
-                "- Do NOT read out structured data verbatim (e.g., don't say 'order_id: o302, status: Pending').\n"
-                "- Instead, summarize and rephrase information as a friendly customer service agent would speak.\n"
-                "- For example, instead of 'Order o302 has status: Pending, items: [item1, item2], amount: 100', "
-                "say 'Your order o302 is currently pending. It includes [item names] and the total is 100 tk.'\n"
-                "- Always use 'tk' (Taka) as the currency unit, not 'rupee' or other currencies.\n"
-                "- Make responses sound natural and human-like, as if you're speaking directly to the customer.\n"
-                "- Focus on the key information the customer cares about, not technical details.\n"
-                "- Avoid reading lists or dictionaries verbatim - summarize and present information conversationally.\n"
-                f"{thank_you_branding}"
-                f"{scope_limitation}"
+            # Single pass: `seen.add` returns None, so it records the id as it goes
+            chat_items = chat_ctx.items
+            seen = {item.id for item in chat_items}
+            chat_items.extend(
+                item for item in recent_items
+                if item.id not in seen and not seen.add(item.id)
             )
         
+        # Inject live summary for fast grounding with language context
+        summary = userdata.summarize()
         chat_ctx.add_message(
             role="system",
-            content=(
-                f"You are {agent_name}. Current session summary:\n{userdata.summarize()}\n\n"
-                f"{id_formatting_instructions}\n"
-                f"{conversational_instructions}\n"
-                f"{lang_instructions}"
+            content=_build_system_content(
+                agent_name, language, not self.include_thank_you, summary
             ),
         )
         
         await self.update_chat_ctx(chat_ctx)
         
-        # Generate greeting for all agents
-        if userdata.prev_agent is None:
-            # Initial greeting for first agent (GreeterAgent)
-            # GreeterAgent will use its own concise branding greeting with name
-            if language == "bn-BD":
-                await self.session.generate_reply(
-                    instructions="Say concisely: 'স্বাগতম বাংলাদেশের নম্বর ওয়ান ই-কমার্স প্ল্যাটফর্ম কার্টআপে। আমি নাওমি, কার্টআপের কাস্টমার অ্যাসিস্ট্যান্ট। আমি আপনাকে কীভাবে সাহায্য করতে পারি?' Keep it short and to the point. No extra explanations."
-                )
-            else:
-                await self.session.generate_reply(
-                    instructions="Say concisely: 'Welcome to Bangladesh number one e-commerce platform CartUp. I'm Nawme, CartUp's Customer Assistant. How can I help you today?' Keep it short and to the point. No extra explanations."
-                )
-        else:
-            # Default greeting for transferred agents (can be overridden)
+        # Greeting for transferred agents (can be overridden).
+        # generate_reply snapshots the agent chat_ctx when it is scheduled, so it has to
+        # follow update_chat_ctx with the merged history; the returned SpeechHandle is
+        # deliberately not awaited so on_enter does not block on playout.
+        if prev_agent is not None:
             await self._generate_transfer_greeting()
     
+    def _say_cached(self, text: str) -> None:
+        """Speak a fixed phrase, playing its audio from the TTS disk cache when available."""
+        tts_engine = self.tts or self.session.tts
+        if tts_engine is None:
+            self.session.say(text)
+            return
+        self.session.say(text, audio=cached_audio(tts_engine, text))
+    
+    def _transfer_intro(self, language: str) -> Optional[str]:
+        """Fixed phrase this agent speaks first after a transfer, if any (prefetched on transfer)."""
+        return None
+    
     async def _generate_transfer_greeting(self) -> None:
         """No-op transfer greeting to avoid duplicate turns; the target agent's on_enter will greet."""
         return
@@ -245,5 +400,22 @@ class BaseAgent(Agent):
         next_agent = userdata.agents[name]
         userdata.prev_agent = current_agent
         
+        # Open the target's connections while the transfer message plays (prewarm() is
+        # non-blocking; plugins without a warm-up treat it as a no-op)
+        tts_engine = next_agent.tts or context.session.tts
+        llm_engine = next_agent.llm or context.session.llm
+        if tts_engine:
+            tts_engine.prewarm()
+        if llm_engine:
+            llm_engine.prewarm()
+
+        # Start synthesizing the target's fixed intro now so its audio is ready when the
+        # target's on_enter plays it; this also opens the Google TTS channel, which has
+        # no prewarm of its own
+        if isinstance(next_agent, BaseAgent):
+            intro = next_agent._transfer_intro(userdata.language or "en-IN")
+            if intro and tts_engine:
+                prefetch(tts_engine, intro)
+        
         # Announce transfer before handing off to the target agent.
-        return next_agent, f"Transferring to {name}."
+        return next_agent, _transfer_msg(name)
@@ -2,91 +2,142 @@
 Greeter agent - initial point of contact and routing agent
 """
 
-from livekit.agents.llm import function_tool
+import functools
+from typing import Dict, Final, Tuple
+
+from livekit.agents.llm import FunctionTool, function_tool
 from livekit.plugins import google, openai
 from livekit.plugins.google import beta as google_beta
 
-from .base_agent import BaseAgent
+from .base_agent import BaseAgent, LangConfig, WELCOME_MESSAGES
+from ..config import build_google_tts, get_openai_client
 from ..session.user_data import RunContext_T
 from ..tools.common_tools import set_user, set_current_order
 
 
+# Static part first and the language-specific part last, so every session of an agent
+# shares the same byte-identical prompt prefix (OpenAI prompt caching matches on prefix)
+_GREETER_STATIC_PREFIX: Final[str] = (
+    "Start by introducing yourself to the user."
+    "You are CartUp's friendly voice assistant. Your name is Nawme (নাওমি). You are CartUp's customer assistant.\n"
+    "IMPORTANT: Language is already selected (check userdata.language). Do NOT ask for language selection.\n"
+    "GREETING RULES - Keep it concise and to the point:\n"
+    "- ALWAYS start with the branding message: 'Welcome to Bangladesh number one e-commerce platform CartUp' (in the user's language)\n"
+    "- Then immediately ask how you can help: 'How can I help you today?' or 'আমি আপনাকে কীভাবে সাহায্য করতে পারি?' (Bengali)\n"
+    "- Keep the greeting short - no extra fluff or explanations\n"
+    "BRANDING MESSAGES:\n"
+    "- English: 'Welcome to Bangladesh number one e-commerce platform CartUp. How can I help you today?'\n"
+    "ROUTING - CRITICAL: DO NOT handle queries yourself. ALWAYS transfer to specialized agents immediately.\n"
+    "ROUTING PRIORITY RULES:\n"
+    "- If user mentions 'order', 'track order', 'order status', 'order ID', 'order details', 'order history', 'order modification' → IMMEDIATELY CALL to_order() tool\n"
+    "- If user explicitly says 'transfer to order agent' or 'order agent' → IMMEDIATELY CALL to_order() tool\n"
+    "- Order tracking queries ALWAYS go to OrderAgent, NOT TicketAgent\n"
+    "- Only use to_ticket() if user explicitly wants to CREATE a NEW support ticket for a problem (damaged item, wrong item, missing item)\n"
+    "ENGLISH ROUTING EXAMPLES:\n"
+    "- 'I want to track my order' → CALL to_order()\n"
+    "- 'Check my order status' → CALL to_order()\n"
+    "- 'What's my order ID 0301?' → CALL to_order()\n"
+    "- 'Transfer me to order agent' → CALL to_order()\n"
+    "- 'I want to modify my order' → CALL to_order()\n"
+    "- 'Create a ticket for damaged product' → CALL to_ticket()\n"
+    "- 'I want to return my order' → CALL to_returns()\n"
+    "- 'Recommend me products' → CALL to_recommend()\n"
+    "TOOL USAGE:\n"
+    "- Use set_user() if user_id is needed\n"
+    "- Use set_current_order() if order_id is needed\n"
+    "- DO NOT ask for user_id or order_id yourself - let the specialized agents handle that\n"
+    "- Your ONLY job is to identify intent and transfer immediately\n"
+)
+
+_GREETER_LANG_SUFFIX: Final[Dict[str, str]] = {
+    "bn-BD": (
+        "BENGALI BRANDING MESSAGE:\n"
+        "- 'স্বাগতম বাংলাদেশের নম্বর ওয়ান ই-কমার্স প্ল্যাটফর্ম কার্টআপে। আমি আপনাকে কীভাবে সাহায্য করতে পারি?'\n"
+        "BENGALI ROUTING EXAMPLES:\n"
+        "- 'আমার অর্ডার ট্র্যাক করতে চাই' → CALL to_order()\n"
+        "- 'অর্ডার দেখতে চাই' → CALL to_order()\n"
+        "- 'অর্ডারের অবস্থা জানতে চান' → CALL to_order()\n"
+        "- 'অর্ডার আইডি 0301' → CALL to_order()\n"
+        "- 'অর্ডার এজেন্টে যেতে চাই' → CALL to_order()\n"
+        "- 'অর্ডার পরিবর্তন করতে চাই' → CALL to_order()\n"
+        "- 'নষ্ট পণ্যের জন্য টিকেট তৈরি করতে চাই' → CALL to_ticket()\n"
+        "- 'অর্ডার রিটার্ন করতে চাই' → CALL to_returns()\n"
+        "- 'পণ্যের সুপারিশ চাই' → CALL to_recommend()\n"
+        "Always respond in Bangladesh Bengali with authentic Bangladesh accent, pronunciation, and cultural context."
+    ),
+    "en-IN": "Always respond in English.",
+}
+
+# Language dispatch table: voice, prompt and fixed greeting together
+_GREETER_LANG_CONFIG: Final[Dict[str, LangConfig]] = {
+    "bn-BD": LangConfig(
+        voice="bn-IN-Chirp3-HD-Despina",
+        tts_language="bn-IN",
+        speaking_rate=1.1,
+        instructions=_GREETER_STATIC_PREFIX + _GREETER_LANG_SUFFIX["bn-BD"],
+        intro=WELCOME_MESSAGES["bn-BD"],
+    ),
+    "en-IN": LangConfig(
+        voice="en-IN-Chirp3-HD-Despina",
+        tts_language="en-IN",
+        speaking_rate=1,
+        instructions=_GREETER_STATIC_PREFIX + _GREETER_LANG_SUFFIX["en-IN"],
+        intro=WELCOME_MESSAGES["en-IN"],
+    ),
+}
+
+
+# Built once at import and shared; Agent.__init__ needs a list (it calls .copy())
+_GREETER_TOOLS: Final[Tuple[FunctionTool, ...]] = (set_user, set_current_order)
+
+
+def _lang_config(language: str) -> LangConfig:
+    return _GREETER_LANG_CONFIG.get(language, _GREETER_LANG_CONFIG["en-IN"])
+
+
+@functools.lru_cache(maxsize=4)
+def _get_tts(language: str) -> google.TTS:
+    """Shared GreeterAgent TTS client per language (agents are rebuilt for every session)."""
+    # Alternative: Gemini TTS
+    # if language == "bn-BD":
+    #     return google_beta.GeminiTTS(
+    #         model="gemini-2.5-flash-preview-tts",
+    #         voice_name="alloy-bn",  # Example Bengali voice
+    #         instructions="Speak in a friendly and engaging tone, using Bangladeshi Bengali accent."
+    #     )
+    # else:
+    #     return google_beta.GeminiTTS(
+    #         model="gemini-2.5-flash-preview-tts",
+    #         voice_name="Zephyr",  # Example English voice
+    #         instructions="Speak in a friendly and engaging tone, Bangladeshi English accent."
+    #     )
+    cfg = _lang_config(language)
+    return build_google_tts(cfg.voice, cfg.tts_language, cfg.speaking_rate)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_llm(language: str) -> openai.LLM:
+    """Shared GreeterAgent LLM client per language."""
+    return openai.LLM(
+        model="gpt-4o-mini",
+        client=get_openai_client(),
+        temperature=0.3,  # responses already stream; prompt_cache_key pins the prompt cache
+        prompt_cache_key=f"cartup-greeter-{language}",
+    )
+
+
 class GreeterAgent(BaseAgent):
     """Greeter agent that routes users to specialized agents."""
     
+    include_thank_you = False
+    
     def __init__(self, language: str = "en-IN") -> None:
-        import logging
-        logger = logging.getLogger("cartup-agent")
-        
-        # Dynamic TTS based on language
-        if language == "bn-BD":
-            tts_config = google.TTS(voice_name="bn-IN-Chirp3-HD-Despina", language="bn-IN", speaking_rate=1.1)
-            #logger.info(f"[GreeterAgent] TTS configured: Bengali voice 'bn-IN-Chirp3-HD-Despina' (language: bn-IN)")
-        else:
-            tts_config = google.TTS(voice_name="en-IN-Chirp3-HD-Despina", language="en-IN", speaking_rate=1)
-            #logger.info(f"[GreeterAgent] TTS configured: English voice 'en-IN-Chirp3-HD-Algenib' (language: en-IN)")
-
-        # if language == "bn-BD":
-        #     tts_config = google_beta.GeminiTTS(
-        #         model="gemini-2.5-flash-preview-tts",
-        #         voice_name="alloy-bn",  # Example Bengali voice
-        #         instructions="Speak in a friendly and engaging tone, using Bangladeshi Bengali accent."
-        #     )
-        # else:
-        #     tts_config = google_beta.GeminiTTS(
-        #         model="gemini-2.5-flash-preview-tts",
-        #         voice_name="Zephyr",  # Example English voice
-        #         instructions="Speak in a friendly and engaging tone, Bangladeshi English accent."
-        #     )
+        tts_config = _get_tts(language)
         
         super().__init__(
-            instructions=(
-                "Start by introducing yourself to the user."
-                "You are CartUp's friendly voice assistant. Your name is Nawme (নাওমি). You are CartUp's customer assistant.\n"
-                "IMPORTANT: Language is already selected (check userdata.language). Do NOT ask for language selection.\n"
-                "GREETING RULES - Keep it concise and to the point:\n"
-                "- ALWAYS start with the branding message: 'Welcome to Bangladesh number one e-commerce platform CartUp' (in the user's language)\n"
-                "- Then immediately ask how you can help: 'How can I help you today?' or 'আমি আপনাকে কীভাবে সাহায্য করতে পারি?' (Bengali)\n"
-                "- Keep the greeting short - no extra fluff or explanations\n"
-                "BRANDING MESSAGES:\n"
-                "- English: 'Welcome to Bangladesh number one e-commerce platform CartUp. How can I help you today?'\n"
-                "- Bengali: 'স্বাগতম বাংলাদেশের নম্বর ওয়ান ই-কমার্স প্ল্যাটফর্ম কার্টআপে। আমি আপনাকে কীভাবে সাহায্য করতে পারি?'\n"
-                "ROUTING - CRITICAL: DO NOT handle queries yourself. ALWAYS transfer to specialized agents immediately.\n"
-                "ROUTING PRIORITY RULES:\n"
-                "- If user mentions 'order', 'track order', 'order status', 'order ID', 'order details', 'order history', 'order modification' → IMMEDIATELY CALL to_order() tool\n"
-                "- If user explicitly says 'transfer to order agent' or 'order agent' → IMMEDIATELY CALL to_order() tool\n"
-                "- Order tracking queries ALWAYS go to OrderAgent, NOT TicketAgent\n"
-                "- Only use to_ticket() if user explicitly wants to CREATE a NEW support ticket for a problem (damaged item, wrong item, missing item)\n"
-                "ENGLISH ROUTING EXAMPLES:\n"
-                "- 'I want to track my order' → CALL to_order()\n"
-                "- 'Check my order status' → CALL to_order()\n"
-                "- 'What's my order ID 0301?' → CALL to_order()\n"
-                "- 'Transfer me to order agent' → CALL to_order()\n"
-                "- 'I want to modify my order' → CALL to_order()\n"
-                "- 'Create a ticket for damaged product' → CALL to_ticket()\n"
-                "- 'I want to return my order' → CALL to_returns()\n"
-                "- 'Recommend me products' → CALL to_recommend()\n"
-                "BENGALI ROUTING EXAMPLES (when language is 'bn-BD'):\n"
-                "- 'আমার অর্ডার ট্র্যাক করতে চাই' → CALL to_order()\n"
-                "- 'অর্ডার দেখতে চাই' → CALL to_order()\n"
-                "- 'অর্ডারের অবস্থা জানতে চান' → CALL to_order()\n"
-                "- 'অর্ডার আইডি 0301' → CALL to_order()\n"
-                "- 'অর্ডার এজেন্টে যেতে চাই' → CALL to_order()\n"
-                "- 'অর্ডার পরিবর্তন করতে চাই' → CALL to_order()\n"
-                "- 'নষ্ট পণ্যের জন্য টিকেট তৈরি করতে চাই' → CALL to_ticket()\n"
-                "- 'অর্ডার রিটার্ন করতে চাই' → CALL to_returns()\n"
-                "- 'পণ্যের সুপারিশ চাই' → CALL to_recommend()\n"
-                "TOOL USAGE:\n"
-                "- Use set_user() if user_id is needed\n"
-                "- Use set_current_order() if order_id is needed\n"
-                "- DO NOT ask for user_id or order_id yourself - let the specialized agents handle that\n"
-                "- Your ONLY job is to identify intent and transfer immediately\n"
-                "Always respond in the user's selected language. "
-                "If language is 'bn-BD', respond in Bangladesh Bengali with authentic Bangladesh accent, pronunciation, and cultural context. "
-                "If 'en-IN', respond in English."
-            ),
-            tools=[set_user, set_current_order],
-            llm=openai.LLM(model="gpt-4o-mini"),
+            instructions=_lang_config(language).instructions,
+            tools=list(_GREETER_TOOLS),
+            llm=_get_llm(language),
             tts=tts_config,
         )
     
@@ -136,16 +187,12 @@ class GreeterAgent(BaseAgent):
         - Bengali: 'পণ্যের সুপারিশ', 'কী কিনব', 'সাজেশন'"""
         return await self._transfer_to_agent("recommend", context)
     
+    def _transfer_intro(self, language: str) -> str:
+        return _lang_config(language).intro
+    
     async def _generate_transfer_greeting(self) -> None:
         """Generate a concise greeting when GreeterAgent becomes active after transfer."""
         userdata = self.session.userdata
         language = userdata.language or "en-IN"
         
-        if language == "bn-BD":
-            await self.session.generate_reply(
-                instructions="Say concisely: 'স্বাগতম বাংলাদেশের নম্বর ওয়ান ই-কমার্স প্ল্যাটফর্ম কার্টআপে। আমি নাওমি, কার্টআপের কাস্টমার অ্যাসিস্ট্যান্ট। আমি আপনাকে কীভাবে সাহায্য করতে পারি?' Then wait for user response."
-            )
-        else:
-            await self.session.generate_reply(
-                instructions="Say concisely: 'Welcome to Bangladesh number one e-commerce platform CartUp. I'm Nawme, CartUp's Customer Assistant. How can I help you today?' Then wait for user response."
-            )
+        self._say_cached(self._transfer_intro(language))
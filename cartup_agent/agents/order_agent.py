@@ -2,90 +2,129 @@
 Order management agent - handles order queries and updates
 """
 
+import functools
 import logging
-from livekit.agents.llm import function_tool
+from typing import Dict, Final, Tuple
+
+from livekit.agents.llm import FunctionTool
 from livekit.plugins import google, openai
 
-from .base_agent import BaseAgent    
-from ..session.user_data import RunContext_T
+from .base_agent import BaseAgent, LangConfig, CHECK_CONTEXT_RULE, RESPOND_IN_LANGUAGE
+from .transfer_tools import ToTicketMixin, ToReturnsMixin, ToRecommendMixin
+from ..config import build_google_tts, get_openai_client
 from ..tools.common_tools import set_current_order, to_greeter  
 from ..tools.order_tools import get_order_details, get_user_orders, update_delivery_address
 
 logger = logging.getLogger("cartup-agent")  
 
 
-class OrderAgent(BaseAgent):
+# Static part first and the language-specific part last, so every session of an agent
+# shares the same byte-identical prompt prefix (OpenAI prompt caching matches on prefix)
+_ORDER_STATIC_PREFIX: Final[str] = (
+    "Start by introducing yourself: 'Hi, I’m Tanisha (তানিশা), CartUp's order support assistant.'\n"
+    "You handle order queries: status, items, amount, ETA, address updates.\n"
+    + CHECK_CONTEXT_RULE +
+    "If user_id or order_id is missing, politely ask and then call tools.\n"
+    "If the user wants to create tickets, process returns, or get recommendations, transfer to the appropriate agent.\n"
+    "CONVERSATIONAL RESPONSES:\n"
+    "- When sharing order details, speak naturally like a customer service agent. "
+    "Instead of listing raw data like 'order_id: o302, status: Pending', say 'Your order o302 is currently pending' or 'I can see your order is being prepared'.\n"
+    "- When mentioning amounts, always use 'tk' (Taka) as the currency. For example: 'The total is 5000 tk' or 'Your order amount is 2500 tk'.\n"
+    "- When listing items, describe them naturally. Instead of reading item dictionaries verbatim, say 'You've ordered a Laptop and 2 Mice' or 'Your order includes 3 items'.\n"
+    "- Make it sound like you're personally helping the customer, not reading from a database.\n"
+)
+
+_ORDER_LANG_SUFFIX: Final[Dict[str, str]] = {
+    "bn-BD": (
+        RESPOND_IN_LANGUAGE["bn-BD"] +
+        "BENGALI EXAMPLES:\n"
+        "- Instead of 'order_id: o302, status: Pending', say 'আপনার o302 নম্বর অর্ডারটি এখনো প্রক্রিয়াধীন আছে' or 'আপনার অর্ডার প্রস্তুত হচ্ছে'.\n"
+        "- For amounts: 'মোট পাঁচ হাজার টাকা' or 'আপনার অর্ডারের পরিমাণ আড়াই হাজার টাকা'.\n"
+        "- For items: 'আপনি একটি ল্যাপটপ এবং দুটি মাউস অর্ডার করেছেন' or 'আপনার অর্ডারে তিনটি আইটেম আছে'.\n"
+        "- Use natural Bengali expressions: 'জি, আমি দেখছি', 'আপনার অর্ডার এখনো প্রক্রিয়াধীন', 'আমি আপনাকে সাহায্য করতে পারি'."
+    ),
+    "en-IN": RESPOND_IN_LANGUAGE["en-IN"],
+}
+
+# Language dispatch table: voice, prompt, fixed intro and follow-up instructions together
+_ORDER_LANG_CONFIG: Final[Dict[str, LangConfig]] = {
+    "bn-BD": LangConfig(
+        voice="bn-IN-Chirp3-HD-Aoede",
+        tts_language="bn-IN",
+        speaking_rate=1.1,
+        instructions=_ORDER_STATIC_PREFIX + _ORDER_LANG_SUFFIX["bn-BD"],
+        intro="হাই, আমি তানিশা, কার্টআপের অর্ডার সাপোর্ট অ্যাসিস্ট্যান্ট।",
+        follow_up="You have just introduced yourself as Tanisha. Do not repeat the introduction. Immediately proceed to help the user based on the context from the previous conversation in Bangladesh Bengali. Don't list capabilities, just continue with what they need.",
+    ),
+    "en-IN": LangConfig(
+        voice="en-IN-Chirp-HD-F",
+        tts_language="en-IN",
+        speaking_rate=1,
+        instructions=_ORDER_STATIC_PREFIX + _ORDER_LANG_SUFFIX["en-IN"],
+        intro="Hi, I'm Tanisha, CartUp's order support assistant.",
+        follow_up="You have just introduced yourself as Tanisha. Do not repeat the introduction. Immediately proceed to help the user based on the context from the previous conversation. Don't list capabilities, just continue with what they need.",
+    ),
+}
+
+
+# Built once at import and shared; Agent.__init__ needs a list (it calls .copy())
+_ORDER_TOOLS: Final[Tuple[FunctionTool, ...]] = (
+    set_current_order,
+    to_greeter,
+    get_order_details,
+    get_user_orders,
+    update_delivery_address,
+)
+
+
+def _lang_config(language: str) -> LangConfig:
+    return _ORDER_LANG_CONFIG.get(language, _ORDER_LANG_CONFIG["en-IN"])
+
+
+@functools.lru_cache(maxsize=4)
+def _get_tts(language: str) -> google.TTS:
+    """Shared OrderAgent TTS client per language (agents are rebuilt for every session)."""
+    cfg = _lang_config(language)
+    return build_google_tts(cfg.voice, cfg.tts_language, cfg.speaking_rate)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_llm(language: str) -> openai.LLM:
+    """Shared OrderAgent LLM client per language."""
+    return openai.LLM(
+        model="gpt-4o-mini",
+        client=get_openai_client(),
+        temperature=0.3,  # responses already stream; prompt_cache_key pins the prompt cache
+        prompt_cache_key=f"cartup-order-{language}",
+    )
+
+
+class OrderAgent(ToTicketMixin, ToReturnsMixin, ToRecommendMixin, BaseAgent):
     """Agent that handles order queries: status, items, amount, ETA, address updates."""
     
     def __init__(self, language: str = "en-IN") -> None:
-        # Dynamic TTS based on language
-        if language == "bn-BD":
-            tts_config = google.TTS(voice_name="bn-IN-Chirp3-HD-Aoede", language="bn-IN", speaking_rate=1.1)
-            #logger.info(f"[OrderAgent] TTS configured: Bengali voice 'bn-IN-Chirp3-HD-Despina' (language: bn-IN)")
-        else:
-            tts_config = google.TTS(voice_name="en-IN-Chirp-HD-F", language="en-IN", speaking_rate=1)
-            #logger.info(f"[OrderAgent] TTS configured: English voice 'en-IN-Chirp3-HD-Algenib' (language: en-IN)")
+        tts_config = _get_tts(language)
         
         super().__init__(
-            instructions=(
-                "Start by introducing yourself: 'Hi, I’m Tanisha (তানিশা), CartUp's order support assistant.'\n"
-                "You handle order queries: status, items, amount, ETA, address updates.\n"
-                "Before asking for user_id or order_id, FIRST check the session summary (userdata) and last tool results. "
-                "If they are already present, do not re-ask and proceed.\n"
-                "If user_id or order_id is missing, politely ask and then call tools.\n"
-                "If the user wants to create tickets, process returns, or get recommendations, transfer to the appropriate agent.\n"
-                "CONVERSATIONAL RESPONSES:\n"
-                "- When sharing order details, speak naturally like a customer service agent. "
-                "Instead of listing raw data like 'order_id: o302, status: Pending', say 'Your order o302 is currently pending' or 'I can see your order is being prepared'.\n"
-                "- When mentioning amounts, always use 'tk' (Taka) as the currency. For example: 'The total is 5000 tk' or 'Your order amount is 2500 tk'.\n"
-                "- When listing items, describe them naturally. Instead of reading item dictionaries verbatim, say 'You've ordered a Laptop and 2 Mice' or 'Your order includes 3 items'.\n"
-                "- Make it sound like you're personally helping the customer, not reading from a database.\n"
-                "IMPORTANT: Always respond in the user's selected language. Check userdata.language for the current language preference. "
-                "If language is 'bn-BD', respond in Bangladesh Bengali with authentic Bangladesh accent, pronunciation, and cultural context. "
-                "If 'en-IN', respond in English.\n"
-                "BENGALI EXAMPLES (when language is 'bn-BD'):\n"
-                "- Instead of 'order_id: o302, status: Pending', say 'আপনার o302 নম্বর অর্ডারটি এখনো প্রক্রিয়াধীন আছে' or 'আপনার অর্ডার প্রস্তুত হচ্ছে'.\n"
-                "- For amounts: 'মোট পাঁচ হাজার টাকা' or 'আপনার অর্ডারের পরিমাণ আড়াই হাজার টাকা'.\n"
-                "- For items: 'আপনি একটি ল্যাপটপ এবং দুটি মাউস অর্ডার করেছেন' or 'আপনার অর্ডারে তিনটি আইটেম আছে'.\n"
-                "- Use natural Bengali expressions: 'জি, আমি দেখছি', 'আপনার অর্ডার এখনো প্রক্রিয়াধীন', 'আমি আপনাকে সাহায্য করতে পারি'."
-            ),
-            tools=[
-                set_current_order,
-                to_greeter,
-                get_order_details,
-                get_user_orders,
-                update_delivery_address,
-            ],
-            llm=openai.LLM(model="gpt-4o-mini"),
+            instructions=_lang_config(language).instructions,
+            tools=list(_ORDER_TOOLS),
+            llm=_get_llm(language),
             tts=tts_config,
         )
     
-    @function_tool()
-    async def to_ticket(self, context: RunContext_T):
-        """Transfer to TicketAgent for support ticket creation and tracking."""
-        return await self._transfer_to_agent("ticket", context)
-    
-    @function_tool()
-    async def to_returns(self, context: RunContext_T):
-        """Transfer to ReturnAgent for returns and refunds."""
-        return await self._transfer_to_agent("returns", context)
-    
-    @function_tool()
-    async def to_recommend(self, context: RunContext_T):
-        """Transfer to RecommendAgent for product recommendations."""
-        return await self._transfer_to_agent("recommend", context)
+    def _transfer_intro(self, language: str) -> str:
+        return _lang_config(language).intro
     
     async def _generate_transfer_greeting(self) -> None:
         """Generate a greeting when OrderAgent becomes active."""
         userdata = self.session.userdata
         language = userdata.language or "en-IN"
-        logger.info(f"[OrderAgent] Generating transfer greeting with language: {language} (from userdata.language: {userdata.language})")
+        logger.info(
+            "[OrderAgent] Generating transfer greeting with language: %s (from userdata.language: %s)",
+            language, userdata.language,
+        )
         
-        if language == "bn-BD":
-            await self.session.generate_reply(
-                instructions="Say a very short intro in Bangladesh Bengali: 'হাই, আমি তানিশা, কার্টআপের অর্ডার সাপোর্ট অ্যাসিস্ট্যান্ট।।' Then immediately proceed to help the user based on the context from the previous conversation in Bangladesh Bengali. Don't list capabilities, just identify yourself briefly and continue with what they need."
-            )
-        else:
-            await self.session.generate_reply(
-                instructions="Say a very short intro: 'Hi, I'm Tanisha, CartUp's order support assistant.' Then immediately proceed to help the user based on the context from the previous conversation. Don't list capabilities, just identify yourself briefly and continue with what they need."
-            )
+        # Fixed intro is played from the TTS cache; the LLM only continues from the context
+        cfg = _lang_config(language)
+        self._say_cached(cfg.intro)
+        self.session.generate_reply(instructions=cfg.follow_up)
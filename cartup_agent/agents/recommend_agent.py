@@ -2,92 +2,128 @@
 Product recommendation agent - provides personalized recommendations
 """
 
-from livekit.agents.llm import function_tool
+import functools
+import logging
+from typing import Dict, Final, Tuple
+
+from livekit.agents.llm import FunctionTool
 from livekit.plugins import google, openai
 
-from .base_agent import BaseAgent
-from ..session.user_data import RunContext_T
+from .base_agent import BaseAgent, LangConfig, CHECK_CONTEXT_RULE, RESPOND_IN_LANGUAGE
+from .transfer_tools import ToOrderMixin, ToTicketMixin, ToReturnsMixin
+from ..config import build_google_tts, get_openai_client
 from ..tools.common_tools import set_user, to_greeter
 from ..tools.recommend_tools import get_recommendations, get_product_details, add_to_wishlist
 
+logger = logging.getLogger("cartup-agent")
+
+
+# Static part first and the language-specific part last, so every session of an agent
+# shares the same byte-identical prompt prefix (OpenAI prompt caching matches on prefix)
+_RECOMMEND_STATIC_PREFIX: Final[str] = (
+    "You provide simple personalized recommendations using a dummy profile list. "
+    "Ask for user_id if missing. Offer to add to wishlist (simulated). "
+    "Start by introducing yourself: 'Hi, I’m Sneha (স্নেহা), CartUp's recommendation assistant.'\n"
+    + CHECK_CONTEXT_RULE +
+    "If the user wants to check orders, create tickets, or process returns, transfer to the appropriate agent.\n"
+    "CONVERSATIONAL RESPONSES:\n"
+    "- When recommending products, describe them naturally. Instead of reading product IDs and technical specs verbatim, "
+    "speak about benefits and features in a friendly way. Say 'I think you'd love this Laptop - it's perfect for your needs' "
+    "instead of 'product_id: p001, name: Laptop, description: ...'.\n"
+    "- When mentioning prices, always use 'tk' (Taka). For example: 'This product is available for 25000 tk' or 'The price is 5000 tk'.\n"
+    "- When listing recommendations, present them conversationally. Say 'Based on your preferences, I'd recommend these 3 products' "
+    "instead of reading out a list of product dictionaries.\n"
+    "- Make recommendations sound personal and helpful, like a friendly sales associate, not a database query result.\n"
+)
+
+_RECOMMEND_LANG_SUFFIX: Final[Dict[str, str]] = {
+    "bn-BD": (
+        RESPOND_IN_LANGUAGE["bn-BD"] +
+        "BENGALI EXAMPLES:\n"
+        "- For product recommendations: 'আমার মনে হচ্ছে আপনি এই ল্যাপটপটি পছন্দ করবেন - এটি আপনার প্রয়োজনের জন্য পারফেক্ট' "
+        "instead of 'product_id: p001, name: Laptop, description: ...'.\n"
+        "- For prices: 'এই পণ্যটি পঁচিশ হাজার টাকায় পাওয়া যাচ্ছে' or 'দাম পাঁচ হাজার টাকা'.\n"
+        "- For recommendations list: 'আপনার পছন্দ অনুযায়ী, আমি এই তিনটি পণ্য সুপারিশ করব'.\n"
+        "- Use natural Bengali expressions: 'আমি মনে করি', 'আপনার জন্য ভাল হবে', 'এটি দেখে নিন'."
+    ),
+    "en-IN": RESPOND_IN_LANGUAGE["en-IN"],
+}
+
+# Language dispatch table: voice, prompt, fixed intro and follow-up instructions together
+_RECOMMEND_LANG_CONFIG: Final[Dict[str, LangConfig]] = {
+    "bn-BD": LangConfig(
+        voice="bn-IN-Chirp3-HD-Callirrhoe",
+        tts_language="bn-IN",
+        speaking_rate=1.1,
+        instructions=_RECOMMEND_STATIC_PREFIX + _RECOMMEND_LANG_SUFFIX["bn-BD"],
+        intro="হাই, আমি স্নেহা, কার্টআপের রিকমেন্ডেশন অ্যাসিস্ট্যান্ট।",
+        follow_up="You have just introduced yourself as Sneha. Do not repeat the introduction. Immediately proceed to help the user based on the context from the previous conversation in Bangladesh Bengali. Don't list capabilities, just continue with what they need.",
+    ),
+    "en-IN": LangConfig(
+        voice="en-IN-Chirp3-HD-Kore",
+        tts_language="en-IN",
+        speaking_rate=1,
+        instructions=_RECOMMEND_STATIC_PREFIX + _RECOMMEND_LANG_SUFFIX["en-IN"],
+        intro="Hi, I'm Sneha, CartUp's recommendation assistant.",
+        follow_up="You have just introduced yourself as Sneha. Do not repeat the introduction. Immediately proceed to help the user based on the context from the previous conversation. Don't list capabilities, just continue with what they need.",
+    ),
+}
+
+
+# Built once at import and shared; Agent.__init__ needs a list (it calls .copy())
+_RECOMMEND_TOOLS: Final[Tuple[FunctionTool, ...]] = (
+    set_user,
+    to_greeter,
+    get_recommendations,
+    get_product_details,
+    add_to_wishlist,
+)
+
+
+def _lang_config(language: str) -> LangConfig:
+    return _RECOMMEND_LANG_CONFIG.get(language, _RECOMMEND_LANG_CONFIG["en-IN"])
 
-class RecommendAgent(BaseAgent):
+
+@functools.lru_cache(maxsize=4)
+def _get_tts(language: str) -> google.TTS:
+    """Shared RecommendAgent TTS client per language (agents are rebuilt for every session)."""
+    cfg = _lang_config(language)
+    logger.info("[RecommendAgent] TTS configured: voice '%s' (language: %s)", cfg.voice, cfg.tts_language)
+    return build_google_tts(cfg.voice, cfg.tts_language, cfg.speaking_rate)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_llm(language: str) -> openai.LLM:
+    """Shared RecommendAgent LLM client per language."""
+    return openai.LLM(
+        model="gpt-4o-mini",
+        client=get_openai_client(),
+        prompt_cache_key=f"cartup-recommend-{language}",
+    )
+
+
+class RecommendAgent(ToOrderMixin, ToTicketMixin, ToReturnsMixin, BaseAgent):
     """Agent that provides personalized product recommendations."""
     
     def __init__(self, language: str = "en-IN") -> None:
-        import logging
-        logger = logging.getLogger("cartup-agent")
-        
-        # Dynamic TTS based on language
-        if language == "bn-BD":
-            tts_config = google.TTS(voice_name="bn-IN-Chirp3-HD-Callirrhoe", language="bn-IN", speaking_rate=1.1)
-            logger.info(f"[RecommendAgent] TTS configured: Bengali voice 'bn-IN-Chirp3-HD-Despina' (language: bn-IN)")
-        else:
-            tts_config = google.TTS(voice_name="en-IN-Chirp3-HD-Kore", language="en-IN", speaking_rate=1)
-            logger.info(f"[RecommendAgent] TTS configured: English voice 'en-IN-Chirp3-HD-Algenib' (language: en-IN)")
+        tts_config = _get_tts(language)
         
         super().__init__(
-            instructions=(
-                "You provide simple personalized recommendations using a dummy profile list. "
-                "Ask for user_id if missing. Offer to add to wishlist (simulated). "
-                "Start by introducing yourself: 'Hi, I’m Sneha (স্নেহা), CartUp's recommendation assistant.'\n"
-                "Before asking for user_id or order_id, FIRST check the session summary (userdata) and last tool results. "
-                "If they are already present, do not re-ask and proceed.\n"
-                "If the user wants to check orders, create tickets, or process returns, transfer to the appropriate agent.\n"
-                "CONVERSATIONAL RESPONSES:\n"
-                "- When recommending products, describe them naturally. Instead of reading product IDs and technical specs verbatim, "
-                "speak about benefits and features in a friendly way. Say 'I think you'd love this Laptop - it's perfect for your needs' "
-                "instead of 'product_id: p001, name: Laptop, description: ...'.\n"
-                "- When mentioning prices, always use 'tk' (Taka). For example: 'This product is available for 25000 tk' or 'The price is 5000 tk'.\n"
-                "- When listing recommendations, present them conversationally. Say 'Based on your preferences, I'd recommend these 3 products' "
-                "instead of reading out a list of product dictionaries.\n"
-                "- Make recommendations sound personal and helpful, like a friendly sales associate, not a database query result.\n"
-                "IMPORTANT: Always respond in the user's selected language. Check userdata.language for the current language preference. "
-                "If language is 'bn-BD', respond in Bangladesh Bengali with authentic Bangladesh accent, pronunciation, and cultural context. "
-                "If 'en-IN', respond in English.\n"
-                "BENGALI EXAMPLES (when language is 'bn-BD'):\n"
-                "- For product recommendations: 'আমার মনে হচ্ছে আপনি এই ল্যাপটপটি পছন্দ করবেন - এটি আপনার প্রয়োজনের জন্য পারফেক্ট' "
-                "instead of 'product_id: p001, name: Laptop, description: ...'.\n"
-                "- For prices: 'এই পণ্যটি পঁচিশ হাজার টাকায় পাওয়া যাচ্ছে' or 'দাম পাঁচ হাজার টাকা'.\n"
-                "- For recommendations list: 'আপনার পছন্দ অনুযায়ী, আমি এই তিনটি পণ্য সুপারিশ করব'.\n"
-                "- Use natural Bengali expressions: 'আমি মনে করি', 'আপনার জন্য ভাল হবে', 'এটি দেখে নিন'."
-            ),
-            tools=[
-                set_user,
-                to_greeter,
-                get_recommendations,
-                get_product_details,
-                add_to_wishlist,
-            ],
-            llm=openai.LLM(model="gpt-4o-mini"),
+            instructions=_lang_config(language).instructions,
+            tools=list(_RECOMMEND_TOOLS),
+            llm=_get_llm(language),
             tts=tts_config,
         )
     
-    @function_tool()
-    async def to_order(self, context: RunContext_T):
-        """Transfer to OrderAgent for order-related queries."""
-        return await self._transfer_to_agent("order", context)
-    
-    @function_tool()
-    async def to_ticket(self, context: RunContext_T):
-        """Transfer to TicketAgent for support ticket creation and tracking."""
-        return await self._transfer_to_agent("ticket", context)
-    
-    @function_tool()
-    async def to_returns(self, context: RunContext_T):
-        """Transfer to ReturnAgent for returns and refunds."""
-        return await self._transfer_to_agent("returns", context)
+    def _transfer_intro(self, language: str) -> str:
+        return _lang_config(language).intro
     
     async def _generate_transfer_greeting(self) -> None:
         """Generate a greeting when RecommendAgent becomes active."""
         userdata = self.session.userdata
         language = userdata.language or "en-IN"
         
-        if language == "bn-BD":
-            await self.session.generate_reply(
-                instructions="Say a very short intro in Bangladesh Bengali: 'হাই, আমি স্নেহা, কার্টআপের রিকমেন্ডেশন অ্যাসিস্ট্যান্ট।' Then immediately proceed to help the user based on the context from the previous conversation in Bangladesh Bengali. Don't list capabilities, just identify yourself briefly and continue with what they need."
-            )
-        else:
-            await self.session.generate_reply(
-                instructions="Say a very short intro: 'Hi, I'm Sneha, CartUp's recommendation assistant.' Then immediately proceed to help the user based on the context from the previous conversation. Don't list capabilities, just identify yourself briefly and continue with what they need."
-            )
+        # Fixed intro is played from the TTS cache; the LLM only continues from the context
+        cfg = _lang_config(language)
+        self._say_cached(cfg.intro)
+        self.session.generate_reply(instructions=cfg.follow_up)
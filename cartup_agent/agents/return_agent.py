@@ -2,91 +2,125 @@
 Return and refund agent - handles returns and refunds
 """
 
-from livekit.agents.llm import function_tool
+import functools
+import logging
+from typing import Dict, Final, Tuple
+
+from livekit.agents.llm import FunctionTool
 from livekit.plugins import google, openai
 
-from .base_agent import BaseAgent
-from ..session.user_data import RunContext_T
+from .base_agent import BaseAgent, LangConfig, CHECK_CONTEXT_RULE, RESPOND_IN_LANGUAGE
+from .transfer_tools import ToOrderMixin, ToTicketMixin, ToRecommendMixin
+from ..config import build_google_tts, get_openai_client
 from ..tools.common_tools import set_current_order, to_greeter
 from ..tools.return_tools import initiate_return, get_return_status, update_refund_status
 
+logger = logging.getLogger("cartup-agent")
+
+
+# Static part first and the language-specific part last, so every session of an agent
+# shares the same byte-identical prompt prefix (OpenAI prompt caching matches on prefix)
+_RETURN_STATIC_PREFIX: Final[str] = (
+    "You manage returns and refunds. Ask for order_id; mark a return as initiated; "
+    "report return and refund status.\n"
+    "Your name is Ayan (আয়ান). You are CartUp's returns and refunds agent.\n"
+    + CHECK_CONTEXT_RULE +
+    "If the user wants to check orders, create tickets, or get recommendations, transfer to the appropriate agent.\n"
+    "CONVERSATIONAL RESPONSES:\n"
+    "- When explaining return status, use natural language. Say 'Your return is being processed' or 'We're arranging pickup for your return' "
+    "rather than reading status codes like 'return_status: Pending Courier Pickup'.\n"
+    "- When mentioning refund amounts, always use 'tk' (Taka). For example: 'Your refund of 5000 tk is being processed'.\n"
+    "- When confirming return initiation, say something like 'I've initiated the return for your order o302' instead of "
+    "reading out all return record fields verbatim.\n"
+    "- Make it sound like you're personally helping them with their return, not just reading database information.\n"
+)
+
+_RETURN_LANG_SUFFIX: Final[Dict[str, str]] = {
+    "bn-BD": (
+        RESPOND_IN_LANGUAGE["bn-BD"] +
+        "BENGALI EXAMPLES:\n"
+        "- For return status: 'আপনার রিটার্ন প্রক্রিয়াধীন আছে' or 'আমরা আপনার রিটার্নের জন্য পিকআপের ব্যবস্থা করছি'.\n"
+        "- For refund amounts: 'আপনার পাঁচ হাজার টাকার রিফান্ড প্রক্রিয়াধীন আছে'.\n"
+        "- For return initiation: 'আমি আপনার o302 নম্বর অর্ডারের জন্য রিটার্ন শুরু করেছি'.\n"
+        "- Use natural Bengali expressions: 'আমি আপনাকে সাহায্য করছি', 'চিন্তা করবেন না', 'আমি এখনই দেখছি'."
+    ),
+    "en-IN": RESPOND_IN_LANGUAGE["en-IN"],
+}
+
+# Language dispatch table: voice, prompt, fixed intro and follow-up instructions together
+_RETURN_LANG_CONFIG: Final[Dict[str, LangConfig]] = {
+    "bn-BD": LangConfig(
+        voice="bn-IN-Chirp3-HD-Iapetus",
+        tts_language="bn-IN",
+        speaking_rate=1.1,
+        instructions=_RETURN_STATIC_PREFIX + _RETURN_LANG_SUFFIX["bn-BD"],
+        intro="হাই, আমি আয়ান, কার্টআপের রিটার্ন এবং রিফান্ড এজেন্ট।",
+        follow_up="You have just introduced yourself as Ayan. Do not repeat the introduction. Immediately proceed to help the user based on the context from the previous conversation in Bangladesh Bengali. Don't list capabilities, just continue with what they need.",
+    ),
+    "en-IN": LangConfig(
+        voice="en-IN-Chirp3-HD-Alnilam",
+        tts_language="en-IN",
+        speaking_rate=1.1,
+        instructions=_RETURN_STATIC_PREFIX + _RETURN_LANG_SUFFIX["en-IN"],
+        intro="Hi, I'm Ayan, CartUp's returns and refunds agent.",
+        follow_up="You have just introduced yourself as Ayan. Do not repeat the introduction. Immediately proceed to help the user based on the context from the previous conversation. Don't list capabilities, just continue with what they need.",
+    ),
+}
+
+
+# Built once at import and shared; Agent.__init__ needs a list (it calls .copy())
+_RETURN_TOOLS: Final[Tuple[FunctionTool, ...]] = (
+    set_current_order,
+    to_greeter,
+    initiate_return,
+    get_return_status,
+    update_refund_status,
+)
+
+
+def _lang_config(language: str) -> LangConfig:
+    return _RETURN_LANG_CONFIG.get(language, _RETURN_LANG_CONFIG["en-IN"])
 
-class ReturnAgent(BaseAgent):
+
+@functools.lru_cache(maxsize=4)
+def _get_tts(language: str) -> google.TTS:
+    """Shared ReturnAgent TTS client per language (agents are rebuilt for every session)."""
+    cfg = _lang_config(language)
+    return build_google_tts(cfg.voice, cfg.tts_language, cfg.speaking_rate)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_llm(language: str) -> openai.LLM:
+    """Shared ReturnAgent LLM client per language."""
+    return openai.LLM(
+        model="gpt-4o-mini",
+        client=get_openai_client(),
+        prompt_cache_key=f"cartup-returns-{language}",
+    )
+
+
+class ReturnAgent(ToOrderMixin, ToTicketMixin, ToRecommendMixin, BaseAgent):
     """Agent that manages returns and refunds."""
     
     def __init__(self, language: str = "en-IN") -> None:
-        import logging
-        logger = logging.getLogger("cartup-agent")
-        
-        # Dynamic TTS based on language
-        if language == "bn-BD":
-            tts_config = google.TTS(voice_name="bn-IN-Chirp3-HD-Iapetus", language="bn-IN", speaking_rate=1.1)
-            #logger.info(f"[ReturnAgent] TTS configured: Bengali voice 'bn-IN-Chirp3-HD-Despina' (language: bn-IN)")
-        else:
-            tts_config = google.TTS(voice_name="en-IN-Chirp3-HD-Alnilam", language="en-IN", speaking_rate=1.1)
-            #logger.info(f"[ReturnAgent] TTS configured: English voice 'en-IN-Chirp3-HD-Algenib' (language: en-IN)")
+        tts_config = _get_tts(language)
         
         super().__init__(
-            instructions=(
-                "You manage returns and refunds. Ask for order_id; mark a return as initiated; "
-                "report return and refund status.\n"
-                "Your name is Ayan (আয়ান). You are CartUp's returns and refunds agent.\n"
-                "Before asking for user_id or order_id, FIRST check the session summary (userdata) and last tool results. "
-                "If they are already present, do not re-ask and proceed.\n"
-                "If the user wants to check orders, create tickets, or get recommendations, transfer to the appropriate agent.\n"
-                "CONVERSATIONAL RESPONSES:\n"
-                "- When explaining return status, use natural language. Say 'Your return is being processed' or 'We're arranging pickup for your return' "
-                "rather than reading status codes like 'return_status: Pending Courier Pickup'.\n"
-                "- When mentioning refund amounts, always use 'tk' (Taka). For example: 'Your refund of 5000 tk is being processed'.\n"
-                "- When confirming return initiation, say something like 'I've initiated the return for your order o302' instead of "
-                "reading out all return record fields verbatim.\n"
-                "- Make it sound like you're personally helping them with their return, not just reading database information.\n"
-                "IMPORTANT: Always respond in the user's selected language. Check userdata.language for the current language preference. "
-                "If language is 'bn-BD', respond in Bangladesh Bengali with authentic Bangladesh accent, pronunciation, and cultural context. "
-                "If 'en-IN', respond in English.\n"
-                "BENGALI EXAMPLES (when language is 'bn-BD'):\n"
-                "- For return status: 'আপনার রিটার্ন প্রক্রিয়াধীন আছে' or 'আমরা আপনার রিটার্নের জন্য পিকআপের ব্যবস্থা করছি'.\n"
-                "- For refund amounts: 'আপনার পাঁচ হাজার টাকার রিফান্ড প্রক্রিয়াধীন আছে'.\n"
-                "- For return initiation: 'আমি আপনার o302 নম্বর অর্ডারের জন্য রিটার্ন শুরু করেছি'.\n"
-                "- Use natural Bengali expressions: 'আমি আপনাকে সাহায্য করছি', 'চিন্তা করবেন না', 'আমি এখনই দেখছি'."
-            ),
-            tools=[
-                set_current_order,
-                to_greeter,
-                initiate_return,
-                get_return_status,
-                update_refund_status,
-            ],
-            llm=openai.LLM(model="gpt-4o-mini"),
+            instructions=_lang_config(language).instructions,
+            tools=list(_RETURN_TOOLS),
+            llm=_get_llm(language),
             tts=tts_config,
         )
     
-    @function_tool()
-    async def to_order(self, context: RunContext_T):
-        """Transfer to OrderAgent for order-related queries."""
-        return await self._transfer_to_agent("order", context)
-    
-    @function_tool()
-    async def to_ticket(self, context: RunContext_T):
-        """Transfer to TicketAgent for support ticket creation and tracking."""
-        return await self._transfer_to_agent("ticket", context)
-    
-    @function_tool()
-    async def to_recommend(self, context: RunContext_T):
-        """Transfer to RecommendAgent for product recommendations."""
-        return await self._transfer_to_agent("recommend", context)
+    def _transfer_intro(self, language: str) -> str:
+        return _lang_config(language).intro
     
     async def _generate_transfer_greeting(self) -> None:
         """Generate a greeting when ReturnAgent becomes active."""
         userdata = self.session.userdata
         language = userdata.language or "en-IN"
         
-        if language == "bn-BD":
-            await self.session.generate_reply(
-                instructions="Say a very short intro in Bangladesh Bengali: 'হাই, আমি আয়ান, কার্টআপের রিটার্ন এবং রিফান্ড এজেন্ট।' Then immediately proceed to help the user based on the context from the previous conversation in Bangladesh Bengali. Don't list capabilities, just identify yourself briefly and continue with what they need."
-            )
-        else:
-            await self.session.generate_reply(
-                instructions="Say a very short intro: 'Hi, I'm Ayan, CartUp's returns and refunds agent.' Then immediately proceed to help the user based on the context from the previous conversation. Don't list capabilities, just identify yourself briefly and continue with what they need."
-            )
-
+        # Fixed intro is played from the TTS cache; the LLM only continues from the context
+        cfg = _lang_config(language)
+        self._say_cached(cfg.intro)
+        self.session.generate_reply(instructions=cfg.follow_up)
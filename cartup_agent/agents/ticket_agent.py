@@ -2,89 +2,124 @@
 Support ticket agent - creates and tracks support tickets
 """
 
-from livekit.agents.llm import function_tool
+import functools
+import logging
+from typing import Dict, Final, Tuple
+
+from livekit.agents.llm import FunctionTool
 from livekit.plugins import google, openai
 
-from .base_agent import BaseAgent
-from ..session.user_data import RunContext_T
+from .base_agent import BaseAgent, LangConfig, CHECK_CONTEXT_RULE, RESPOND_IN_LANGUAGE
+from .transfer_tools import ToOrderMixin, ToReturnsMixin, ToRecommendMixin
+from ..config import build_google_tts, get_openai_client
 from ..tools.common_tools import set_current_order, to_greeter
 from ..tools.ticket_tools import create_ticket, track_ticket, get_ticket_status
 
+logger = logging.getLogger("cartup-agent")
+
+
+# Static part first and the language-specific part last, so every session of an agent
+# shares the same byte-identical prompt prefix (OpenAI prompt caching matches on prefix)
+_TICKET_STATIC_PREFIX: Final[str] = (
+    "Start by introducing yourself: 'Hi, I’m Rafid (রাফিদ), CartUp's support ticket assistant.'\n"
+    "You create and track support tickets for orders (missing, damaged, wrong item, etc.).\n"
+    + CHECK_CONTEXT_RULE +
+    "Ask for order_id, issue description; create ticket; return ticket_id and status.\n"
+    "If the user wants to check orders, process returns, or get recommendations, transfer to the appropriate agent.\n"
+    "CONVERSATIONAL RESPONSES:\n"
+    "- When sharing ticket status, speak conversationally. Say 'I've created a ticket for you' or 'Your ticket is currently being reviewed' "
+    "rather than reading out ticket IDs and status codes verbatim.\n"
+    "- When confirming ticket creation, say something like 'I've created ticket t602 for your order o302' instead of "
+    "'ticket_id: t602, order_id: o302, status: Open'.\n"
+    "- Make it sound like you're personally handling their issue, not just reading database records.\n"
+)
+
+_TICKET_LANG_SUFFIX: Final[Dict[str, str]] = {
+    "bn-BD": (
+        RESPOND_IN_LANGUAGE["bn-BD"] +
+        "BENGALI EXAMPLES:\n"
+        "- For ticket status: 'আমি আপনার জন্য একটি টিকেট তৈরি করেছি' or 'আপনার টিকেটটি এখন পর্যালোচনা করা হচ্ছে'.\n"
+        "- For ticket creation: 'আমি আপনার o302 নম্বর অর্ডারের জন্য t602 নম্বর টিকেট তৈরি করেছি' instead of "
+        "'ticket_id: t602, order_id: o302, status: Open'.\n"
+        "- Use natural Bengali expressions: 'আমি আপনার সমস্যা সমাধান করছি', 'চিন্তা করবেন না', 'আমি এখনই দেখছি'."
+    ),
+    "en-IN": RESPOND_IN_LANGUAGE["en-IN"],
+}
+
+# Language dispatch table: voice, prompt, fixed intro and follow-up instructions together
+_TICKET_LANG_CONFIG: Final[Dict[str, LangConfig]] = {
+    "bn-BD": LangConfig(
+        voice="bn-IN-Chirp3-HD-Orus",
+        tts_language="bn-IN",
+        speaking_rate=1.1,
+        instructions=_TICKET_STATIC_PREFIX + _TICKET_LANG_SUFFIX["bn-BD"],
+        intro="হাই, আমি রাফিদ, কার্টআপের সাপোর্ট টিকেট এজেন্ট।",
+        follow_up="You have just introduced yourself as Rafid. Do not repeat the introduction. Immediately proceed to help the user based on the context from the previous conversation in Bangladesh Bengali. Don't list capabilities, just continue with what they need.",
+    ),
+    "en-IN": LangConfig(
+        voice="en-IN-Chirp3-HD-Laomedeia",
+        tts_language="en-IN",
+        speaking_rate=1,
+        instructions=_TICKET_STATIC_PREFIX + _TICKET_LANG_SUFFIX["en-IN"],
+        intro="Hi, I'm Rafid, CartUp's ticket support assistant.",
+        follow_up="You have just introduced yourself as Rafid. Do not repeat the introduction. Immediately proceed to help the user based on the context from the previous conversation. Don't list capabilities, just continue with what they need.",
+    ),
+}
+
+
+# Built once at import and shared; Agent.__init__ needs a list (it calls .copy())
+_TICKET_TOOLS: Final[Tuple[FunctionTool, ...]] = (
+    set_current_order,
+    to_greeter,
+    create_ticket,
+    track_ticket,
+    get_ticket_status,
+)
+
+
+def _lang_config(language: str) -> LangConfig:
+    return _TICKET_LANG_CONFIG.get(language, _TICKET_LANG_CONFIG["en-IN"])
 
-class TicketAgent(BaseAgent):
+
+@functools.lru_cache(maxsize=4)
+def _get_tts(language: str) -> google.TTS:
+    """Shared TicketAgent TTS client per language (agents are rebuilt for every session)."""
+    cfg = _lang_config(language)
+    return build_google_tts(cfg.voice, cfg.tts_language, cfg.speaking_rate)
+
+
+@functools.lru_cache(maxsize=4)
+def _get_llm(language: str) -> openai.LLM:
+    """Shared TicketAgent LLM client per language."""
+    return openai.LLM(
+        model="gpt-4o-mini",
+        client=get_openai_client(),
+        prompt_cache_key=f"cartup-ticket-{language}",
+    )
+
+
+class TicketAgent(ToOrderMixin, ToReturnsMixin, ToRecommendMixin, BaseAgent):
     """Agent that creates and tracks support tickets for orders."""
     
     def __init__(self, language: str = "en-IN") -> None:
-        import logging
-        logger = logging.getLogger("cartup-agent")
-        
-        # Dynamic TTS based on language
-        if language == "bn-BD":
-            tts_config = google.TTS(voice_name="bn-IN-Chirp3-HD-Orus", language="bn-IN", speaking_rate=1.1)
-            #logger.info(f"[TicketAgent] TTS configured: Bengali voice 'bn-IN-Chirp3-HD-Despina' (language: bn-IN)")
-        else:
-            tts_config = google.TTS(voice_name="en-IN-Chirp3-HD-Laomedeia", language="en-IN", speaking_rate=1)
-            #logger.info(f"[TicketAgent] TTS configured: English voice 'en-IN-Chirp3-HD-Algenib' (language: en-IN)")
+        tts_config = _get_tts(language)
         
         super().__init__(
-            instructions=(
-                "Start by introducing yourself: 'Hi, I’m Rafid (রাফিদ), CartUp's support ticket assistant.'\n"
-                "You create and track support tickets for orders (missing, damaged, wrong item, etc.).\n"
-                "Before asking for user_id or order_id, FIRST check the session summary (userdata) and last tool results. "
-                "If they are already present, do not re-ask and proceed.\n"
-                "Ask for order_id, issue description; create ticket; return ticket_id and status.\n"
-                "If the user wants to check orders, process returns, or get recommendations, transfer to the appropriate agent.\n"
-                "CONVERSATIONAL RESPONSES:\n"
-                "- When sharing ticket status, speak conversationally. Say 'I've created a ticket for you' or 'Your ticket is currently being reviewed' "
-                "rather than reading out ticket IDs and status codes verbatim.\n"
-                "- When confirming ticket creation, say something like 'I've created ticket t602 for your order o302' instead of "
-                "'ticket_id: t602, order_id: o302, status: Open'.\n"
-                "- Make it sound like you're personally handling their issue, not just reading database records.\n"
-                "IMPORTANT: Always respond in the user's selected language. Check userdata.language for the current language preference. "
-                "If language is 'bn-BD', respond in Bangladesh Bengali with authentic Bangladesh accent, pronunciation, and cultural context. "
-                "If 'en-IN', respond in English.\n"
-                "BENGALI EXAMPLES (when language is 'bn-BD'):\n"
-                "- For ticket status: 'আমি আপনার জন্য একটি টিকেট তৈরি করেছি' or 'আপনার টিকেটটি এখন পর্যালোচনা করা হচ্ছে'.\n"
-                "- For ticket creation: 'আমি আপনার o302 নম্বর অর্ডারের জন্য t602 নম্বর টিকেট তৈরি করেছি' instead of "
-                "'ticket_id: t602, order_id: o302, status: Open'.\n"
-                "- Use natural Bengali expressions: 'আমি আপনার সমস্যা সমাধান করছি', 'চিন্তা করবেন না', 'আমি এখনই দেখছি'."
-            ),
-            tools=[
-                set_current_order,
-                to_greeter,
-                create_ticket,
-                track_ticket,
-                get_ticket_status,
-            ],
-            llm=openai.LLM(model="gpt-4o-mini"),
+            instructions=_lang_config(language).instructions,
+            tools=list(_TICKET_TOOLS),
+            llm=_get_llm(language),
             tts=tts_config,
         )
     
-    @function_tool()
-    async def to_order(self, context: RunContext_T):
-        """Transfer to OrderAgent for order-related queries."""
-        return await self._transfer_to_agent("order", context)
-    
-    @function_tool()
-    async def to_returns(self, context: RunContext_T):
-        """Transfer to ReturnAgent for returns and refunds."""
-        return await self._transfer_to_agent("returns", context)
-    
-    @function_tool()
-    async def to_recommend(self, context: RunContext_T):
-        """Transfer to RecommendAgent for product recommendations."""
-        return await self._transfer_to_agent("recommend", context)
+    def _transfer_intro(self, language: str) -> str:
+        return _lang_config(language).intro
     
     async def _generate_transfer_greeting(self) -> None:
         """Generate a greeting when TicketAgent becomes active."""
         userdata = self.session.userdata
         language = userdata.language or "en-IN"
         
-        if language == "bn-BD":
-            await self.session.generate_reply(
-                instructions="Say a very short intro in Bangladesh Bengali: 'হাই, আমি রাফিদ, কার্টআপের সাপোর্ট টিকেট এজেন্ট।' Then immediately proceed to help the user based on the context from the previous conversation in Bangladesh Bengali. Don't list capabilities, just identify yourself briefly and continue with what they need."
-            )
-        else:
-            await self.session.generate_reply(
-                instructions="Say a very short intro: 'Hi, I'm Rafid, CartUp's ticket support assistant.' Then immediately proceed to help the user based on the context from the previous conversation. Don't list capabilities, just identify yourself briefly and continue with what they need."
-            )
+        # Fixed intro is played from the TTS cache; the LLM only continues from the context
+        cfg = _lang_config(language)
+        self._say_cached(cfg.intro)
+        self.session.generate_reply(instructions=cfg.follow_up)
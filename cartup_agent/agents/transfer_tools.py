@@ -0,0 +1,44 @@
+"""
+Shared transfer tools for CartUp agents
+One mixin per target so an agent never gets a tool that transfers to itself
+"""
+
+from livekit.agents.llm import function_tool
+
+from ..session.user_data import RunContext_T
+
+
+class ToOrderMixin:
+    """Adds the `to_order` transfer tool."""
+
+    @function_tool()
+    async def to_order(self, context: RunContext_T):
+        """Transfer to OrderAgent for order-related queries."""
+        return await self._transfer_to_agent("order", context)
+
+
+class ToTicketMixin:
+    """Adds the `to_ticket` transfer tool."""
+
+    @function_tool()
+    async def to_ticket(self, context: RunContext_T):
+        """Transfer to TicketAgent for support ticket creation and tracking."""
+        return await self._transfer_to_agent("ticket", context)
+
+
+class ToReturnsMixin:
+    """Adds the `to_returns` transfer tool."""
+
+    @function_tool()
+    async def to_returns(self, context: RunContext_T):
+        """Transfer to ReturnAgent for returns and refunds."""
+        return await self._transfer_to_agent("returns", context)
+
+
+class ToRecommendMixin:
+    """Adds the `to_recommend` transfer tool."""
+
+    @function_tool()
+    async def to_recommend(self, context: RunContext_T):
+        """Transfer to RecommendAgent for product recommendations."""
+        return await self._transfer_to_agent("recommend", context)
@@ -3,7 +3,24 @@ Configuration module for CartUp voice agent
 Contains voice IDs, model configuration, and agent settings
 """
 
+import asyncio
+import functools
+import json
+import threading
+import weakref
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
+
+import httpx
+import numpy as np
+import openai as openai_sdk
+from google.api_core.client_options import ClientOptions
+from google.cloud import texttospeech
+from livekit.agents import NOT_GIVEN
 from livekit.plugins import google, openai, silero
+from livekit.plugins.silero import onnx_model
+
+from .sentence_tokenizer import BengaliSentenceTokenizer
 
 # Supported languages
 SUPPORTED_LANGUAGES = ["en-IN", "bn-BD"]  # bn-BD for Bangladesh Bengali accent
@@ -25,6 +42,12 @@ BENGALI_TTS_VOICE_MALE_ALT = "bn-IN-Chirp3-HD-Alnilam"  # Bengali India - Male (
 # Default voice (female)
 BENGALI_TTS_VOICE = BENGALI_TTS_VOICE_FEMALE  # Default to female voice
 
+# Default Bengali voice per gender preference
+_BENGALI_VOICE_BY_GENDER = {
+    "female": BENGALI_TTS_VOICE_FEMALE,
+    "male": BENGALI_TTS_VOICE_MALE,
+}
+
 # Voice configuration for different agents
 # Note: Using Google TTS with en-IN-Chirp-HD-F voice (Indian English, Chirp HD, Female)
 # Can be customized per agent if needed
@@ -36,14 +59,196 @@ VOICES = {
     "recommend": "female",
 }
 
+# TTS output sample rate; 16 kHz is full-band for speech and a third fewer PCM bytes
+# on the wire (and in the TTS cache) than the plugin's 24 kHz default
+TTS_SAMPLE_RATE = 16000
+
+# Google TTS API clients per event loop. A grpc.aio channel is bound to the loop that
+# opened it, and with JobExecutorType.THREAD every job runs on its own loop.
+_GoogleClientKey = Tuple[str, Optional[str], Optional[str]]  # location, credentials file, credentials info
+_google_tts_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_GoogleClientKey, texttospeech.TextToSpeechAsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_google_tts_clients_lock = threading.Lock()
+
+
+def _get_google_tts_client(
+    location: str = "global",
+    credentials_info: Optional[dict] = None,
+    credentials_file: Optional[str] = None,
+) -> texttospeech.TextToSpeechAsyncClient:
+    """
+    Google TTS API client (one gRPC channel) shared by every voice and agent on the
+    running event loop, per location and credentials.
+    """
+    key: _GoogleClientKey = (
+        location,
+        credentials_file or None,
+        json.dumps(credentials_info, sort_keys=True) if credentials_info else None,
+    )
+    loop = asyncio.get_running_loop()
+    with _google_tts_clients_lock:
+        clients = _google_tts_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            api_endpoint = "texttospeech.googleapis.com"
+            if location != "global":
+                api_endpoint = f"{location}-texttospeech.googleapis.com"
+            client_options = ClientOptions(api_endpoint=api_endpoint)
+            if credentials_info:
+                client = texttospeech.TextToSpeechAsyncClient.from_service_account_info(
+                    credentials_info, client_options=client_options
+                )
+            elif credentials_file:
+                client = texttospeech.TextToSpeechAsyncClient.from_service_account_file(
+                    credentials_file, client_options=client_options
+                )
+            else:
+                client = texttospeech.TextToSpeechAsyncClient(client_options=client_options)
+            clients[key] = client
+    return client
+
+
+class _SharedChannelTTS(google.TTS):
+    """
+    google.TTS that synthesizes over the API client shared on the running event loop.
+
+    The plugin opens a separate gRPC channel (and auth handshake) for each TTS instance,
+    although only the voice differs between agents. All requests are per-call, so a
+    single channel can carry the streams for every voice. The instance itself is shared
+    across sessions, so it never keeps a client of its own: each call picks the client
+    of the loop it runs on.
+    """
+
+    @property
+    def label(self) -> str:
+        # Report as the plain plugin so metrics and TTS cache keys stay the same
+        return f"{google.TTS.__module__}.{google.TTS.__name__}"
+
+    def _ensure_client(self) -> texttospeech.TextToSpeechAsyncClient:
+        return _get_google_tts_client(
+            self._location, self._credentials_info, self._credentials_file
+        )
+
+
+def build_google_tts(voice_name: str, language: str, speaking_rate: float) -> google.TTS:
+    """
+    Construct a Google TTS client with the project-wide low-latency settings.
+
+    Streaming synthesis sends text sentence by sentence and plays audio as it arrives;
+    raw PCM output can be pushed to the room as soon as each chunk lands, without
+    waiting for Ogg pages to fill and be Opus-decoded. Clients running on the same event
+    loop share one gRPC channel.
+    Bengali voices split on '।' too, so the first sentence is spoken while the LLM is
+    still generating the rest of the reply. Audio is requested at TTS_SAMPLE_RATE.
+    """
+    return _SharedChannelTTS(
+        voice_name=voice_name,
+        language=language,
+        speaking_rate=speaking_rate,
+        use_streaming=True,
+        audio_encoding=texttospeech.AudioEncoding.PCM,
+        sample_rate=TTS_SAMPLE_RATE,
+        tokenizer=BengaliSentenceTokenizer() if language.startswith("bn") else NOT_GIVEN,
+    )
+
+
+class _PerLoopTransport(httpx.AsyncBaseTransport):
+    """
+    HTTP transport that keeps one connection pool per running event loop.
+
+    httpcore pools are bound to the loop that opened them, and with
+    JobExecutorType.THREAD every job runs on its own loop. Pools are dropped with
+    their loop.
+    """
+
+    def __init__(self, limits: httpx.Limits) -> None:
+        self._limits = limits
+        self._pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _pool(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.get(loop)
+            if pool is None:
+                pool = self._pools[loop] = httpx.AsyncHTTPTransport(limits=self._limits)
+        return pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        with self._lock:
+            pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            await pool.aclose()
+
+
+@functools.lru_cache(maxsize=1)
+def get_openai_client() -> openai_sdk.AsyncClient:
+    """
+    OpenAI API client shared by every agent's LLM.
+
+    Each openai.LLM would otherwise open its own HTTPX pool, so a transfer to another
+    agent paid for a fresh TLS handshake. With one pool per event loop, keep-alive
+    connections are reused across agents and concurrent requests of that loop.
+    """
+    return openai_sdk.AsyncClient(
+        http_client=httpx.AsyncClient(
+            timeout=httpx.Timeout(connect=15.0, read=5.0, write=5.0, pool=5.0),
+            follow_redirects=True,
+            transport=_PerLoopTransport(
+                httpx.Limits(
+                    max_connections=200,
+                    max_keepalive_connections=100,
+                    keepalive_expiry=120,
+                )
+            ),
+        ),
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_vad() -> silero.VAD:
+    """Silero VAD, loaded once per process (loading the ONNX model is the slow part)."""
+    return silero.VAD.load()
+
+
+def warmup_vad() -> silero.VAD:
+    """
+    Load the VAD and run one inference on silence.
+
+    ONNX Runtime allocates its buffers on the first run, so without this the first user
+    utterance of a process pays for it. Call it from the worker's prewarm (after fork,
+    before the process takes jobs).
+    """
+    vad = get_vad()
+    model = onnx_model.OnnxModel(onnx_session=vad._onnx_session, sample_rate=vad._opts.sample_rate)
+    model(np.zeros(model.window_size_samples, dtype=np.float32))
+    return vad
+
+
 # Model configuration matching livekit_basic_agent.py
-def get_voice_pipeline():
-    """Returns configured voice pipeline components."""
+def get_voice_pipeline(llm_provider: str = "openai", speaking_rate: float = 1.2):
+    """
+    Returns configured voice pipeline components.
+    
+    Args:
+        llm_provider: "openai" (gpt-4o-mini) or "google" (Gemini)
+        speaking_rate: TTS speaking rate multiplier
+    """
+    if llm_provider == "google":
+        llm = google.LLM()
+    else:
+        llm = openai.LLM(model="gpt-4o-mini", client=get_openai_client())
     return {
         "stt": google.STT(),
-        "llm": openai.LLM(model="gpt-4o-mini"),
-        "tts": google.TTS(voice_name="en-IN-Chirp-HD-F", language="en-IN", speaking_rate=1.2),
-        "vad": silero.VAD.load(),
+        "llm": llm,
+        "tts": _cached_tts("en-IN", ENGLISH_TTS_VOICE, speaking_rate),
+        "vad": get_vad(),
     }
 
 # Agent-specific configurations
@@ -53,6 +258,34 @@ AGENT_CONFIG = {
 }
 
 
+@functools.lru_cache(maxsize=1)
+def get_session_llm() -> openai.LLM:
+    """Session-level default LLM (agents bring their own), shared by every session."""
+    return openai.LLM(model="gpt-4o-mini", client=get_openai_client())
+
+
+def get_stt_for_language(language: str) -> google.STT:
+    """
+    Returns a Google STT (chirp_2) instance for a session language.
+
+    Built per session: the instance's gRPC connection pool is bound to the event loop
+    it first connects on, and with JobExecutorType.THREAD every job runs on its own
+    loop. The pool connects lazily, so building the instance is cheap.
+    """
+    return google.STT(
+        model="chirp_2",
+        location="asia-northeast1",  # Required location for chirp_2 with Bengali support
+        languages=["bn-BD" if language == "bn-BD" else "en-IN"],
+        detect_language=False,  # Disable auto-detection since we know the language
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_tts(language: str, voice_name: str, speaking_rate: float):
+    """Build (once) the TTS client for a TTS language + voice + rate combination."""
+    return build_google_tts(voice_name, language, speaking_rate)
+
+
 def get_tts_for_language(language: str, voice_name: str = None, gender: str = "female", speaking_rate: float = 1.2):
     """
     Returns appropriate TTS instance based on language preference.
@@ -64,27 +297,34 @@ def get_tts_for_language(language: str, voice_name: str = None, gender: str = "f
         speaking_rate: Speaking rate multiplier (0.25 to 4.0, default 1.2 for 1.2x speed)
     
     Returns:
-        Google TTS instance configured for the specified language
+        Google TTS instance configured for the specified language. Instances are cached
+        per (language, voice, speaking_rate), so repeated calls return the same client.
     """
     if language == "bn-BD":
-        if voice_name:
-            voice = voice_name
-        elif gender == "male":
-            voice = BENGALI_TTS_VOICE_MALE
-        else:
-            voice = BENGALI_TTS_VOICE_FEMALE
+        voice = voice_name or _BENGALI_VOICE_BY_GENDER.get(gender, BENGALI_TTS_VOICE_FEMALE)
         # Use bn-IN language code for TTS (voices are bn-IN), but accent comes from LLM instructions
-        return google.TTS(voice_name=voice, language="bn-IN", speaking_rate=speaking_rate)
+        return _cached_tts("bn-IN", voice, speaking_rate)
     else:
         # Default to English
         voice = voice_name or ENGLISH_TTS_VOICE
-        return google.TTS(voice_name=voice, language="en-IN", speaking_rate=speaking_rate)
+        return _cached_tts("en-IN", voice, speaking_rate)
+
+
+def invalidate_tts_cache() -> None:
+    """
+    Drop the cached TTS clients and the shared Google API clients (e.g. after rotating
+    credentials); the next get_tts_for_language() call builds fresh ones.
+    """
+    _cached_tts.cache_clear()
+    with _google_tts_clients_lock:
+        _google_tts_clients.clear()
 
 
 # Bengali voice options for Bangladesh (bn-BD) - for easy testing
 # Note: Use bn-BD language code for Bangladesh accent
-BENGALI_VOICES = {
-    "female": [
+# Read-only (mapping proxy over tuples) so the shared table cannot drift at runtime
+BENGALI_VOICES = MappingProxyType({
+    "female": (
         "bn-BD-Chirp3-HD-Achernar",      # Currently using
         "bn-BD-Chirp3-HD-Aoede",
         "bn-BD-Chirp3-HD-Autonoe",
@@ -99,8 +339,8 @@ BENGALI_VOICES = {
         "bn-BD-Chirp3-HD-Sulafat",
         "bn-BD-Chirp3-HD-Vindemiatrix",
         "bn-BD-Chirp3-HD-Zephyr",
-    ],
-    "male": [
+    ),
+    "male": (
         "bn-BD-Chirp3-HD-Achird",
         "bn-BD-Chirp3-HD-Algenib",
         "bn-BD-Chirp3-HD-Algieba",
@@ -117,6 +357,12 @@ BENGALI_VOICES = {
         "bn-BD-Chirp3-HD-Schedar",
         "bn-BD-Chirp3-HD-Umbriel",
         "bn-BD-Chirp3-HD-Zubenelgenubi",
-    ]
-}
+    )
+})
 
+# Reverse index for validating a voice name / looking up its gender in O(1)
+BENGALI_VOICE_GENDER = MappingProxyType({
+    voice: gender
+    for gender, voices in BENGALI_VOICES.items()
+    for voice in voices
+})
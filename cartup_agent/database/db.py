@@ -3,11 +3,18 @@ SQLite database implementation for CartUp agent
 Replaces the in-memory DUMMY_DB with persistent storage
 """
 
+import atexit
+import functools
 import sqlite3
-from typing import Optional, Dict, Any, List
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Optional, Dict, Any, Callable, List, Tuple
 from contextlib import contextmanager
 from pathlib import Path
 
+from .writer import BatchWriter
 from .seed_data import (
     get_seed_users,
     get_seed_products,
@@ -23,24 +30,84 @@ DB_DIR = Path(__file__).parent / "data"
 DB_PATH = DB_DIR / "cartup.db"
 
 
+# One connection per thread, opened on first use and kept for the life of the process
+_local = threading.local()
+_open_connections: List[sqlite3.Connection] = []
+_open_connections_lock = threading.Lock()
+
+
+def _connect(read_only: bool = False) -> sqlite3.Connection:
+    """Open a connection and apply the per-connection settings once."""
+    # check_same_thread=False only so the exit hook can close it from the main thread;
+    # each connection is otherwise used by the thread that opened it
+    if read_only:
+        # Autocommit: a SELECT then never leaves a transaction open to commit
+        # as_uri() percent-encodes the path, so '#', '?' or '%' in it are not read as URI syntax
+        conn = sqlite3.connect(DB_PATH.as_uri() + "?mode=ro", uri=True, isolation_level=None,
+                               check_same_thread=False)
+    else:
+        conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+    conn.row_factory = sqlite3.Row  # Enable column access by name
+    if not read_only:
+        conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign keys
+        # In WAL mode NORMAL only syncs at checkpoints
+        conn.execute("PRAGMA synchronous = NORMAL")
+    # Per-connection tuning (not stored in the file); reads are served from the memory
+    # map / page cache
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA mmap_size = 268435456")  # 256 MiB
+    conn.execute("PRAGMA cache_size = -65536")  # 64 MiB
+    with _open_connections_lock:
+        _open_connections.append(conn)
+    return conn
+
+
+@atexit.register
+def _close_connections():
+    """Close every pooled connection at interpreter exit."""
+    with _open_connections_lock:
+        while _open_connections:
+            conn = _open_connections.pop()
+            try:
+                # Refresh planner statistics for the queries this connection ran
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass  # read-only connections cannot write the statistics
+            conn.close()
+
+
 @contextmanager
 def get_connection():
-    """Context manager for database connections with transaction support."""
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row  # Enable column access by name
+    """Context manager for this thread's pooled connection with transaction support."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _connect()
     try:
-        conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign keys
         yield conn
         conn.commit()
     except Exception:
         conn.rollback()
         raise
-    finally:
-        conn.close()
+
+
+@contextmanager
+def get_ro_connection():
+    """Context manager for this thread's read-only connection (no transaction to end)."""
+    conn = getattr(_local, "ro_conn", None)
+    if conn is None:
+        conn = _local.ro_conn = _connect(read_only=True)
+    yield conn
+
+
+# Every write goes through one background thread on its own pooled connection; writes
+# that arrive together are committed in one transaction
+_writer = BatchWriter(get_connection)
 
 
 def _create_schema(conn: sqlite3.Connection):
     """Create database schema if tables don't exist."""
+    # Tables keyed by a natural TEXT id are WITHOUT ROWID: the primary key is the table's
+    # own B-tree, instead of a separate index pointing into a hidden rowid table
     # Users table
     conn.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -49,7 +116,7 @@ def _create_schema(conn: sqlite3.Connection):
             phone TEXT,
             email TEXT,
             created_at TEXT
-        )
+        ) WITHOUT ROWID
     """)
     
     # Products table
@@ -60,9 +127,9 @@ def _create_schema(conn: sqlite3.Connection):
             description TEXT,
             price REAL NOT NULL,
             category TEXT,
-            in_stock INTEGER DEFAULT 1,
+            in_stock INTEGER GENERATED ALWAYS AS (stock_quantity > 0) VIRTUAL,  -- derived, never stored
             stock_quantity INTEGER DEFAULT 0
-        )
+        ) WITHOUT ROWID
     """)
     
     # Orders table
@@ -76,7 +143,7 @@ def _create_schema(conn: sqlite3.Connection):
             address TEXT,
             created_at TEXT,
             FOREIGN KEY (user_id) REFERENCES users(user_id)
-        )
+        ) WITHOUT ROWID
     """)
     
     # Order items table
@@ -84,9 +151,10 @@ def _create_schema(conn: sqlite3.Connection):
         CREATE TABLE IF NOT EXISTS order_items (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             order_id TEXT NOT NULL,
-            product_name TEXT NOT NULL,
+            product_id TEXT NOT NULL,
             quantity INTEGER DEFAULT 1,
-            FOREIGN KEY (order_id) REFERENCES orders(order_id)
+            FOREIGN KEY (order_id) REFERENCES orders(order_id),
+            FOREIGN KEY (product_id) REFERENCES products(product_id)
         )
     """)
     
@@ -99,7 +167,7 @@ def _create_schema(conn: sqlite3.Connection):
             status TEXT NOT NULL,
             created_at TEXT,
             FOREIGN KEY (order_id) REFERENCES orders(order_id)
-        )
+        ) WITHOUT ROWID
     """)
     
     # Returns table
@@ -111,7 +179,7 @@ def _create_schema(conn: sqlite3.Connection):
             reason TEXT,
             created_at TEXT,
             FOREIGN KEY (order_id) REFERENCES orders(order_id)
-        )
+        ) WITHOUT ROWID
     """)
     
     # Recommendations table
@@ -141,8 +209,87 @@ def _create_schema(conn: sqlite3.Connection):
         CREATE TABLE IF NOT EXISTS id_sequences (
             entity_type TEXT PRIMARY KEY,
             next_value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    
+    _create_indexes(conn)
+
+
+def _create_indexes(conn: sqlite3.Connection):
+    """Create lookup indexes on the per-user / per-order columns if they don't exist."""
+    # Column order makes them covering: the selected column is read from the index itself
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_orders_user ON orders(user_id, created_at, order_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id, product_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_order_items_product ON order_items(product_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_order ON tickets(order_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_recs_user ON recommendations(user_id, product_name)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_wishlists_user ON wishlists(user_id, product_id)")
+
+
+def _migrate_products(conn: sqlite3.Connection):
+    """Rebuild a products table that still stores in_stock instead of deriving it."""
+    # table_xinfo marks generated columns as hidden 2 (virtual) or 3 (stored)
+    hidden = {row["name"]: row["hidden"] for row in conn.execute("PRAGMA table_xinfo(products)")}
+    if hidden.get("in_stock") != 0:
+        return
+    # Keep the order_items / wishlists references pointing at "products" through the
+    # rename; neither pragma can be changed inside a transaction
+    conn.execute("PRAGMA foreign_keys = OFF")
+    conn.execute("PRAGMA legacy_alter_table = ON")
+    try:
+        conn.execute("BEGIN")  # rename, copy and drop commit together
+        try:
+            conn.execute("ALTER TABLE products RENAME TO products_old")
+            _create_schema(conn)
+            # in_stock is not copied: the new column derives it from stock_quantity
+            conn.execute("""
+                INSERT INTO products (product_id, name, description, price, category, stock_quantity)
+                SELECT product_id, name, description, price, category, stock_quantity
+                FROM products_old
+            """)
+            conn.execute("DROP TABLE products_old")
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+    finally:
+        conn.execute("PRAGMA legacy_alter_table = OFF")
+        conn.execute("PRAGMA foreign_keys = ON")
+
+
+def _migrate_order_items(conn: sqlite3.Connection):
+    """Rebuild an order_items table that still stores product names instead of product IDs."""
+    columns = {row["name"] for row in conn.execute("PRAGMA table_info(order_items)")}
+    if "product_name" not in columns:
+        return
+    conn.execute("BEGIN")  # rename, copy and drop commit together
+    conn.execute("ALTER TABLE order_items RENAME TO order_items_old")
+    _create_schema(conn)
+    # One product per name (the lowest ID if a name repeats), so every item is copied
+    # exactly once; items whose name matches no product come through with a NULL ID
+    conn.execute("""
+        CREATE TEMP TABLE order_items_migrated AS
+        SELECT i.id, i.order_id, p.product_id, i.quantity, i.product_name
+        FROM order_items_old i
+        LEFT JOIN (SELECT name, MIN(product_id) AS product_id FROM products GROUP BY name) p
+            ON p.name = i.product_name
+    """)
+    unmatched = [
+        row[0] for row in conn.execute(
+            "SELECT DISTINCT product_name FROM order_items_migrated WHERE product_id IS NULL"
         )
+    ]
+    if unmatched:
+        # Raising rolls the whole migration back, leaving the old table as it was
+        raise sqlite3.IntegrityError(
+            "Cannot migrate order_items: no product named " + ", ".join(map(repr, unmatched))
+        )
+    conn.execute("""
+        INSERT INTO order_items (id, order_id, product_id, quantity)
+        SELECT id, order_id, product_id, quantity FROM order_items_migrated
     """)
+    conn.execute("DROP TABLE order_items_migrated")
+    conn.execute("DROP TABLE order_items_old")
 
 
 def _next_id(entity_type: str) -> str:
@@ -155,38 +302,117 @@ def _next_id(entity_type: str) -> str:
     }
     prefix = prefix_map.get(entity_type, "x")
     
-    with get_connection() as conn:
-        # Get or create sequence entry
-        cursor = conn.execute(
-            "SELECT next_value FROM id_sequences WHERE entity_type = ?",
-            (entity_type,)
-        )
-        row = cursor.fetchone()
-        
-        if row is None:
-            # Initialize sequence
-            conn.execute(
-                "INSERT INTO id_sequences (entity_type, next_value) VALUES (?, ?)",
-                (entity_type, 1)
-            )
-            counter = 1
-        else:
-            # Increment and update
-            counter = row["next_value"] + 1
-            conn.execute(
-                "UPDATE id_sequences SET next_value = ? WHERE entity_type = ?",
-                (counter, entity_type)
-            )
+    # Create-or-increment in one atomic statement (SQLite >= 3.35 for RETURNING)
+    counter = _writer.submit(
+        """
+        INSERT INTO id_sequences (entity_type, next_value) VALUES (?, 1)
+        ON CONFLICT(entity_type) DO UPDATE SET next_value = next_value + 1
+        RETURNING next_value
+        """,
+        (entity_type,)
+    ).result()[0][0]
     
     return f"{prefix}{counter}"
 
 
+class _TTLCache:
+    """
+    Small thread-safe LRU whose entries expire `ttl` seconds after they were stored.
+
+    pop() also bumps the key's version, and put() only stores a value read at the
+    current version: a read that started before a write cannot cache what it saw.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        # Versions of recently popped keys; evicting one bumps the epoch, so a read
+        # that began before the eviction still counts as outdated
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def version(self, key: str) -> Tuple[int, int]:
+        """Token to pass to put() for a value read after this call."""
+        with self._lock:
+            return self._epoch, self._versions.get(key, 0)
+
+    def put(self, key: str, value: Dict[str, Any], version: Tuple[int, int]) -> None:
+        with self._lock:
+            if version != (self._epoch, self._versions.get(key, 0)):
+                return  # popped since the value was read
+            self._data[key] = (time.monotonic() + self._ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._versions[key] = self._versions.pop(key, 0) + 1
+            if len(self._versions) > self._maxsize:
+                self._versions.popitem(last=False)
+                self._epoch += 1
+
+
+# Recently read users / orders / products; the same IDs come up again and again within a
+# conversation. Writes made through this module drop the affected entry; the TTL bounds
+# how long a change made by another process can go unseen.
+LOOKUP_CACHE_SIZE = 512
+LOOKUP_CACHE_TTL = 30.0
+_user_cache = _TTLCache(LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL)
+_order_cache = _TTLCache(LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL)
+_product_cache = _TTLCache(LOOKUP_CACHE_SIZE, LOOKUP_CACHE_TTL)
+
+
+def _cached_lookup(cache: _TTLCache):
+    """Serve a single-ID getter from `cache`; misses (None) are not cached."""
+    def decorator(fn: Callable[[str], Optional[Dict[str, Any]]]):
+        @functools.wraps(fn)
+        def wrapper(key: str) -> Optional[Dict[str, Any]]:
+            value = cache.get(key)
+            if value is None:
+                version = cache.version(key)
+                value = fn(key)
+                if value is not None:
+                    cache.put(key, value, version)
+            return value
+        return wrapper
+    return decorator
+
+
+def _split_ids(joined: Optional[str]) -> List[str]:
+    """Split a GROUP_CONCAT(..., CHAR(31)) result back into a list."""
+    return joined.split("\x1f") if joined else []
+
+
+@_cached_lookup(_user_cache)
 def get_user(user_id: str) -> Optional[Dict[str, Any]]:
     """Get user by ID."""
     try:
-        with get_connection() as conn:
+        with get_ro_connection() as conn:
+            # User and their order IDs in one statement (IDs joined with the unit separator)
             cursor = conn.execute(
-                "SELECT * FROM users WHERE user_id = ?",
+                """
+                SELECT u.user_id, u.name, u.phone, u.email,
+                       (SELECT GROUP_CONCAT(order_id, CHAR(31)) FROM (
+                            SELECT order_id FROM orders WHERE user_id = u.user_id ORDER BY created_at
+                       )) AS order_ids
+                FROM users u WHERE u.user_id = ?
+                """,
                 (user_id,)
             )
             row = cursor.fetchone()
@@ -194,30 +420,37 @@ def get_user(user_id: str) -> Optional[Dict[str, Any]]:
             if row is None:
                 return None
             
-            # Get user's orders
-            order_cursor = conn.execute(
-                "SELECT order_id FROM orders WHERE user_id = ? ORDER BY created_at",
-                (user_id,)
-            )
-            order_ids = [r["order_id"] for r in order_cursor.fetchall()]
-            
-            return {
-                "user_id": row["user_id"],
-                "name": row["name"],
-                "phone": row["phone"],
-                "email": row["email"],
-                "orders": order_ids,
-            }
+            user = dict(row)
+            user["orders"] = _split_ids(user.pop("order_ids"))
+            return user
     except Exception:
         return None
 
 
+# Orders with their item names in one statement (names joined with the unit separator)
+_SELECT_ORDERS = """
+    SELECT o.*,
+           (SELECT GROUP_CONCAT(name, CHAR(31)) FROM (
+                SELECT p.name FROM order_items i JOIN products p ON p.product_id = i.product_id
+                WHERE i.order_id = o.order_id ORDER BY i.id
+           )) AS items
+    FROM orders o
+"""
+
+
+def _order_from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    order = dict(row)
+    order["items"] = _split_ids(order["items"])
+    return order
+
+
+@_cached_lookup(_order_cache)
 def get_order(order_id: str) -> Optional[Dict[str, Any]]:
     """Get order by ID."""
     try:
-        with get_connection() as conn:
+        with get_ro_connection() as conn:
             cursor = conn.execute(
-                "SELECT * FROM orders WHERE order_id = ?",
+                _SELECT_ORDERS + " WHERE o.order_id = ?",
                 (order_id,)
             )
             row = cursor.fetchone()
@@ -225,31 +458,33 @@ def get_order(order_id: str) -> Optional[Dict[str, Any]]:
             if row is None:
                 return None
             
-            # Get order items
-            items_cursor = conn.execute(
-                "SELECT product_name FROM order_items WHERE order_id = ?",
-                (order_id,)
-            )
-            items = [r["product_name"] for r in items_cursor.fetchall()]
-            
-            return {
-                "order_id": row["order_id"],
-                "user_id": row["user_id"],
-                "status": row["status"],
-                "items": items,
-                "amount": row["amount"],
-                "delivery_date": row["delivery_date"],
-                "address": row["address"],
-                "created_at": row["created_at"],
-            }
+            return _order_from_row(row)
     except Exception:
         return None
 
 
+def get_orders_bulk(order_ids: List[str]) -> List[Dict[str, Any]]:
+    """Get several orders in one query, in the order of order_ids (unknown IDs are skipped)."""
+    if not order_ids:
+        return []
+    try:
+        with get_ro_connection() as conn:
+            placeholders = ", ".join("?" * len(order_ids))
+            cursor = conn.execute(
+                _SELECT_ORDERS + f" WHERE o.order_id IN ({placeholders})",
+                tuple(order_ids)
+            )
+            orders = {row["order_id"]: _order_from_row(row) for row in cursor}
+            return [orders[order_id] for order_id in order_ids if order_id in orders]
+    except Exception:
+        return []
+
+
+@_cached_lookup(_product_cache)
 def get_product(product_id: str) -> Optional[Dict[str, Any]]:
     """Get product by ID."""
     try:
-        with get_connection() as conn:
+        with get_ro_connection() as conn:
             cursor = conn.execute(
                 "SELECT * FROM products WHERE product_id = ?",
                 (product_id,)
@@ -259,15 +494,9 @@ def get_product(product_id: str) -> Optional[Dict[str, Any]]:
             if row is None:
                 return None
             
-            return {
-                "product_id": row["product_id"],
-                "name": row["name"],
-                "description": row["description"],
-                "price": row["price"],
-                "category": row["category"],
-                "in_stock": bool(row["in_stock"]),
-                "stock_quantity": row["stock_quantity"],
-            }
+            product = dict(row)
+            product["in_stock"] = bool(product["in_stock"])
+            return product
     except Exception:
         return None
 
@@ -275,7 +504,7 @@ def get_product(product_id: str) -> Optional[Dict[str, Any]]:
 def get_ticket(ticket_id: str) -> Optional[Dict[str, Any]]:
     """Get ticket by ID."""
     try:
-        with get_connection() as conn:
+        with get_ro_connection() as conn:
             cursor = conn.execute(
                 "SELECT * FROM tickets WHERE ticket_id = ?",
                 (ticket_id,)
@@ -285,13 +514,7 @@ def get_ticket(ticket_id: str) -> Optional[Dict[str, Any]]:
             if row is None:
                 return None
             
-            return {
-                "ticket_id": row["ticket_id"],
-                "order_id": row["order_id"],
-                "issue": row["issue"],
-                "status": row["status"],
-                "created_at": row["created_at"],
-            }
+            return dict(row)
     except Exception:
         return None
 
@@ -299,7 +522,7 @@ def get_ticket(ticket_id: str) -> Optional[Dict[str, Any]]:
 def get_return(order_id: str) -> Optional[Dict[str, Any]]:
     """Get return by order ID."""
     try:
-        with get_connection() as conn:
+        with get_ro_connection() as conn:
             cursor = conn.execute(
                 "SELECT * FROM returns WHERE order_id = ?",
                 (order_id,)
@@ -309,28 +532,32 @@ def get_return(order_id: str) -> Optional[Dict[str, Any]]:
             if row is None:
                 return None
             
-            return {
-                "order_id": row["order_id"],
-                "status": row["status"],
-                "refund_status": row["refund_status"],
-                "reason": row["reason"],
-                "created_at": row["created_at"],
-            }
+            return dict(row)
     except Exception:
         return None
 
 
 # Write helper functions
 
+@functools.lru_cache(maxsize=2)
+def _iso_date(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+
+def _today_iso() -> str:
+    """Today's date as YYYY-MM-DD; the string is only rebuilt when the day changes."""
+    return _iso_date(date.today().toordinal())
+
+
 def update_order_address(order_id: str, address: str) -> bool:
     """Update delivery address for an order."""
     try:
-        with get_connection() as conn:
-            conn.execute(
-                "UPDATE orders SET address = ? WHERE order_id = ?",
-                (address, order_id)
-            )
-            return conn.total_changes > 0
+        changed = _writer.submit(
+            "UPDATE orders SET address = ? WHERE order_id = ?",
+            (address, order_id)
+        ).result()
+        _order_cache.pop(order_id)
+        return changed > 0
     except Exception:
         return False
 
@@ -339,15 +566,13 @@ def create_ticket_record(ticket_id: str, order_id: str, issue: str, status: str
     """Create a ticket record."""
     try:
         if created_at is None:
-            from datetime import datetime
-            created_at = datetime.now().strftime("%Y-%m-%d")
+            created_at = _today_iso()
         
-        with get_connection() as conn:
-            conn.execute(
-                "INSERT INTO tickets (ticket_id, order_id, issue, status, created_at) VALUES (?, ?, ?, ?, ?)",
-                (ticket_id, order_id, issue, status, created_at)
-            )
-            return True
+        _writer.submit(
+            "INSERT INTO tickets (ticket_id, order_id, issue, status, created_at) VALUES (?, ?, ?, ?, ?)",
+            (ticket_id, order_id, issue, status, created_at)
+        ).result()
+        return True
     except Exception:
         return False
 
@@ -357,15 +582,13 @@ def create_return_record(order_id: str, reason: str, status: str = "Pending Cour
     """Create a return record."""
     try:
         if created_at is None:
-            from datetime import datetime
-            created_at = datetime.now().strftime("%Y-%m-%d")
+            created_at = _today_iso()
         
-        with get_connection() as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO returns (order_id, status, refund_status, reason, created_at) VALUES (?, ?, ?, ?, ?)",
-                (order_id, status, refund_status, reason, created_at)
-            )
-            return True
+        _writer.submit(
+            "INSERT OR REPLACE INTO returns (order_id, status, refund_status, reason, created_at) VALUES (?, ?, ?, ?, ?)",
+            (order_id, status, refund_status, reason, created_at)
+        ).result()
+        return True
     except Exception:
         return False
 
@@ -373,12 +596,11 @@ def create_return_record(order_id: str, reason: str, status: str = "Pending Cour
 def update_refund_status(order_id: str, status: str) -> bool:
     """Update refund status for a return."""
     try:
-        with get_connection() as conn:
-            conn.execute(
-                "UPDATE returns SET refund_status = ? WHERE order_id = ?",
-                (status, order_id)
-            )
-            return conn.total_changes > 0
+        changed = _writer.submit(
+            "UPDATE returns SET refund_status = ? WHERE order_id = ?",
+            (status, order_id)
+        ).result()
+        return changed > 0
     except Exception:
         return False
 
@@ -386,12 +608,11 @@ def update_refund_status(order_id: str, status: str) -> bool:
 def add_to_wishlist(user_id: str, product_id: str) -> bool:
     """Add a product to user's wishlist."""
     try:
-        with get_connection() as conn:
-            conn.execute(
-                "INSERT OR IGNORE INTO wishlists (user_id, product_id) VALUES (?, ?)",
-                (user_id, product_id)
-            )
-            return True
+        _writer.submit(
+            "INSERT OR IGNORE INTO wishlists (user_id, product_id) VALUES (?, ?)",
+            (user_id, product_id)
+        ).result()
+        return True
     except Exception:
         return False
 
@@ -399,12 +620,12 @@ def add_to_wishlist(user_id: str, product_id: str) -> bool:
 def get_recommendations_for_user(user_id: str) -> List[str]:
     """Get list of recommended product names for a user."""
     try:
-        with get_connection() as conn:
+        with get_ro_connection() as conn:
             cursor = conn.execute(
                 "SELECT product_name FROM recommendations WHERE user_id = ?",
                 (user_id,)
             )
-            return [r["product_name"] for r in cursor.fetchall()]
+            return [r[0] for r in cursor]  # single column; iterate without fetchall()
     except Exception:
         return []
 
@@ -412,39 +633,36 @@ def get_recommendations_for_user(user_id: str) -> List[str]:
 def get_wishlist_for_user(user_id: str) -> List[str]:
     """Get list of product IDs in user's wishlist."""
     try:
-        with get_connection() as conn:
+        with get_ro_connection() as conn:
             cursor = conn.execute(
                 "SELECT product_id FROM wishlists WHERE user_id = ?",
                 (user_id,)
             )
-            return [r["product_id"] for r in cursor.fetchall()]
+            return [r[0] for r in cursor]  # single column; iterate without fetchall()
     except Exception:
         return []
 
 
 def _seed_database(conn: sqlite3.Connection):
     """Seed database with sample data from seed_data module."""
-    # Seed users
-    users = get_seed_users()
-    for user_data in users:
-        conn.execute(
-            "INSERT INTO users (user_id, name, phone, email, created_at) VALUES (?, ?, ?, ?, ?)",
-            user_data
-        )
+    # One executemany per table: each INSERT is prepared once and all rows go in the
+    # caller's single transaction
+    conn.executemany(
+        "INSERT INTO users (user_id, name, phone, email, created_at) VALUES (?, ?, ?, ?, ?)",
+        get_seed_users()
+    )
     
-    # Seed products
-    products = get_seed_products()
-    for product_data in products:
-        conn.execute(
-            "INSERT INTO products (product_id, name, description, price, category, in_stock, stock_quantity) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            product_data
-        )
+    conn.executemany(
+        "INSERT INTO products (product_id, name, description, price, category, stock_quantity) VALUES (?, ?, ?, ?, ?, ?)",
+        get_seed_products()
+    )
     
-    # Seed orders and order items
+    # Seed orders and order items (seed items are listed by product name)
     orders = get_seed_orders()
-    for order_data in orders:
-        conn.execute(
-            "INSERT INTO orders (order_id, user_id, status, amount, delivery_date, address, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    product_ids = {name: product_id for product_id, name, *_ in get_seed_products()}
+    conn.executemany(
+        "INSERT INTO orders (order_id, user_id, status, amount, delivery_date, address, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
             (
                 order_data["order_id"],
                 order_data["user_id"],
@@ -454,86 +672,91 @@ def _seed_database(conn: sqlite3.Connection):
                 order_data["address"],
                 order_data["created_at"],
             )
-        )
-        # Insert order items
-        for item_name, quantity in order_data["items"]:
-            conn.execute(
-                "INSERT INTO order_items (order_id, product_name, quantity) VALUES (?, ?, ?)",
-                (order_data["order_id"], item_name, quantity)
-            )
+            for order_data in orders
+        ]
+    )
+    conn.executemany(
+        "INSERT INTO order_items (order_id, product_id, quantity) VALUES (?, ?, ?)",
+        [
+            (order_data["order_id"], product_ids[item_name], quantity)
+            for order_data in orders
+            for item_name, quantity in order_data["items"]
+        ]
+    )
     
-    # Seed tickets
-    tickets = get_seed_tickets()
-    for ticket_data in tickets:
-        conn.execute(
-            "INSERT INTO tickets (ticket_id, order_id, issue, status, created_at) VALUES (?, ?, ?, ?, ?)",
-            ticket_data
-        )
+    conn.executemany(
+        "INSERT INTO tickets (ticket_id, order_id, issue, status, created_at) VALUES (?, ?, ?, ?, ?)",
+        get_seed_tickets()
+    )
     
-    # Seed returns
-    returns = get_seed_returns()
-    for return_data in returns:
-        conn.execute(
-            "INSERT INTO returns (order_id, status, refund_status, reason, created_at) VALUES (?, ?, ?, ?, ?)",
-            return_data
-        )
+    conn.executemany(
+        "INSERT INTO returns (order_id, status, refund_status, reason, created_at) VALUES (?, ?, ?, ?, ?)",
+        get_seed_returns()
+    )
     
-    # Seed recommendations
-    recommendations = get_seed_recommendations()
-    for rec_data in recommendations:
-        conn.execute(
-            "INSERT INTO recommendations (user_id, product_name) VALUES (?, ?)",
-            rec_data
-        )
+    conn.executemany(
+        "INSERT INTO recommendations (user_id, product_name) VALUES (?, ?)",
+        get_seed_recommendations()
+    )
     
-    # Seed wishlists
-    wishlists = get_seed_wishlists()
-    for wishlist_data in wishlists:
-        conn.execute(
-            "INSERT INTO wishlists (user_id, product_id) VALUES (?, ?)",
-            wishlist_data
-        )
+    conn.executemany(
+        "INSERT INTO wishlists (user_id, product_id) VALUES (?, ?)",
+        get_seed_wishlists()
+    )
+
+
+# Set once init_database() has run in this process; later calls return immediately
+_initialized = False
+_init_lock = threading.Lock()
 
 
 def init_database():
-    """Initialize database with schema and sample data."""
+    """Initialize database with schema and sample data (once per process)."""
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if not _initialized:
+            _init_database()
+            _initialized = True
+
+
+def _init_database():
+    """Create, migrate or seed the database file as needed."""
     # Ensure database directory exists
     DB_DIR.mkdir(parents=True, exist_ok=True)
     
+    # Opening a connection creates the file, so check for it first
+    db_exists = DB_PATH.exists()
+    
+    # WAL lets readers run alongside a writer and turns commits into appends. The journal
+    # mode is stored in the database file, so this also converts an existing database.
+    with get_connection() as conn:
+        conn.execute("PRAGMA journal_mode = WAL")
+    
     # Check if database already has data
-    if DB_PATH.exists():
+    if db_exists:
         with get_connection() as conn:
-            cursor = conn.execute("SELECT COUNT(*) as count FROM users")
-            if cursor.fetchone()["count"] > 0:
-                # Database already initialized, skip seeding
+            # Any row will do; LIMIT 1 stops at the first instead of counting them all
+            if conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is not None:
+                # Database already initialized, skip seeding (databases created before
+                # the current schema are brought up to date here)
+                _migrate_order_items(conn)
+                conn.commit()  # the products rebuild sets pragmas that need no open transaction
+                _migrate_products(conn)
+                _create_indexes(conn)
                 return
     
-    # Create schema
+    # Schema, ID sequences and sample data in a single transaction (one commit)
     with get_connection() as conn:
         _create_schema(conn)
-    
-    # Initialize ID sequences
-    with get_connection() as conn:
+        
         # Set initial values to accommodate seed data
         # Users: up to u125, Orders: up to o325, Products: up to p025, Tickets: up to t525
-        conn.execute(
-            "INSERT OR IGNORE INTO id_sequences (entity_type, next_value) VALUES (?, ?)",
-            ("ticket", 600)
-        )
-        conn.execute(
-            "INSERT OR IGNORE INTO id_sequences (entity_type, next_value) VALUES (?, ?)",
-            ("order", 400)
-        )
-        conn.execute(
+        conn.executemany(
             "INSERT OR IGNORE INTO id_sequences (entity_type, next_value) VALUES (?, ?)",
-            ("product", 30)
+            [("ticket", 600), ("order", 400), ("product", 30), ("user", 130)]
         )
-        conn.execute(
-            "INSERT OR IGNORE INTO id_sequences (entity_type, next_value) VALUES (?, ?)",
-            ("user", 130)
-        )
-    
-    # Seed sample data using modular seed_data module
-    with get_connection() as conn:
+        
+        # Seed sample data using modular seed_data module
         _seed_database(conn)
-
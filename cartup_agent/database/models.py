@@ -3,26 +3,26 @@ Data models for CartUp database
 Type definitions and schemas for all entities
 """
 
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from typing import Optional, List
 from datetime import datetime
 
+# __slots__ instead of a per-instance __dict__ (dataclass(slots=...) needs Python 3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class User:
     """User model"""
     user_id: str
     name: str
     phone: str
     email: str
-    orders: List[str] = None  # List of order IDs
-    
-    def __post_init__(self):
-        if self.orders is None:
-            self.orders = []
+    orders: List[str] = field(default_factory=list)  # List of order IDs
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class Product:
     """Product model"""
     product_id: str
@@ -34,7 +34,7 @@ class Product:
     stock_quantity: int = 0
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Order:
     """Order model"""
     order_id: str
@@ -47,7 +47,7 @@ class Order:
     created_at: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class Ticket:
     """Support ticket model"""
     ticket_id: str
@@ -57,7 +57,7 @@ class Ticket:
     created_at: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class Return:
     """Return/refund model"""
     order_id: str
@@ -67,25 +67,17 @@ class Return:
     created_at: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Cart:
     """Shopping cart model"""
     user_id: str
-    items: List[dict] = None  # List of {product_id, quantity, price}
+    items: List[dict] = field(default_factory=list)  # List of {product_id, quantity, price}
     total: float = 0.0
-    
-    def __post_init__(self):
-        if self.items is None:
-            self.items = []
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Wishlist:
     """Wishlist model"""
     user_id: str
-    product_ids: List[str] = None
-    
-    def __post_init__(self):
-        if self.product_ids is None:
-            self.product_ids = []
+    product_ids: List[str] = field(default_factory=list)
 
@@ -39,34 +39,34 @@ def get_seed_users() -> List[Tuple[str, str, str, str, str]]:
     ]
 
 
-def get_seed_products() -> List[Tuple[str, str, str, float, str, int, int]]:
-    """Returns list of (product_id, name, description, price, category, in_stock, stock_quantity) tuples."""
+def get_seed_products() -> List[Tuple[str, str, str, float, str, int]]:
+    """Returns list of (product_id, name, description, price, category, stock_quantity) tuples."""
     return [
-        ("p001", "Smartphone", "Latest model smartphone with advanced features", 299.99, "Electronics", 1, 50),
-        ("p002", "Wireless Earbuds", "High-quality wireless earbuds with noise cancellation", 79.99, "Electronics", 1, 100),
-        ("p003", "Phone Case", "Protective case for smartphones", 19.99, "Accessories", 1, 200),
-        ("p004", "USB-C Charger", "Fast charging USB-C cable", 15.99, "Accessories", 1, 150),
-        ("p005", "Laptop", "High-performance laptop for work and gaming", 899.99, "Electronics", 1, 25),
-        ("p006", "Tablet", "10-inch tablet with high-resolution display", 249.99, "Electronics", 1, 40),
-        ("p007", "Smart Watch", "Fitness tracking smartwatch with heart rate monitor", 199.99, "Electronics", 1, 60),
-        ("p008", "Bluetooth Speaker", "Portable Bluetooth speaker with 360° sound", 49.99, "Electronics", 1, 80),
-        ("p009", "Power Bank", "10000mAh portable power bank", 29.99, "Accessories", 1, 120),
-        ("p010", "Screen Protector", "Tempered glass screen protector", 9.99, "Accessories", 1, 300),
-        ("p011", "Laptop Stand", "Adjustable aluminum laptop stand", 39.99, "Accessories", 1, 90),
-        ("p012", "Wireless Mouse", "Ergonomic wireless mouse", 24.99, "Accessories", 1, 150),
-        ("p013", "Mechanical Keyboard", "RGB mechanical gaming keyboard", 89.99, "Accessories", 1, 45),
-        ("p014", "Webcam", "HD 1080p webcam for video calls", 59.99, "Electronics", 1, 70),
-        ("p015", "Microphone", "USB condenser microphone for streaming", 79.99, "Electronics", 1, 55),
-        ("p016", "Gaming Headset", "Surround sound gaming headset", 129.99, "Electronics", 1, 35),
-        ("p017", "Monitor", "27-inch 4K LED monitor", 349.99, "Electronics", 1, 20),
-        ("p018", "SSD Drive", "1TB NVMe SSD for fast storage", 99.99, "Electronics", 1, 65),
-        ("p019", "RAM Module", "16GB DDR4 RAM module", 69.99, "Electronics", 1, 50),
-        ("p020", "Cooling Pad", "Laptop cooling pad with fans", 34.99, "Accessories", 1, 100),
-        ("p021", "USB Hub", "7-port USB 3.0 hub", 19.99, "Accessories", 1, 110),
-        ("p022", "HDMI Cable", "High-speed HDMI 2.0 cable", 12.99, "Accessories", 1, 200),
-        ("p023", "Ethernet Cable", "Cat6 Ethernet cable 10ft", 8.99, "Accessories", 1, 250),
-        ("p024", "WiFi Adapter", "USB WiFi adapter AC1200", 24.99, "Electronics", 1, 85),
-        ("p025", "External Hard Drive", "2TB portable external hard drive", 79.99, "Electronics", 1, 40),
+        ("p001", "Smartphone", "Latest model smartphone with advanced features", 299.99, "Electronics", 50),
+        ("p002", "Wireless Earbuds", "High-quality wireless earbuds with noise cancellation", 79.99, "Electronics", 100),
+        ("p003", "Phone Case", "Protective case for smartphones", 19.99, "Accessories", 200),
+        ("p004", "USB-C Charger", "Fast charging USB-C cable", 15.99, "Accessories", 150),
+        ("p005", "Laptop", "High-performance laptop for work and gaming", 899.99, "Electronics", 25),
+        ("p006", "Tablet", "10-inch tablet with high-resolution display", 249.99, "Electronics", 40),
+        ("p007", "Smart Watch", "Fitness tracking smartwatch with heart rate monitor", 199.99, "Electronics", 60),
+        ("p008", "Bluetooth Speaker", "Portable Bluetooth speaker with 360° sound", 49.99, "Electronics", 80),
+        ("p009", "Power Bank", "10000mAh portable power bank", 29.99, "Accessories", 120),
+        ("p010", "Screen Protector", "Tempered glass screen protector", 9.99, "Accessories", 300),
+        ("p011", "Laptop Stand", "Adjustable aluminum laptop stand", 39.99, "Accessories", 90),
+        ("p012", "Wireless Mouse", "Ergonomic wireless mouse", 24.99, "Accessories", 150),
+        ("p013", "Mechanical Keyboard", "RGB mechanical gaming keyboard", 89.99, "Accessories", 45),
+        ("p014", "Webcam", "HD 1080p webcam for video calls", 59.99, "Electronics", 70),
+        ("p015", "Microphone", "USB condenser microphone for streaming", 79.99, "Electronics", 55),
+        ("p016", "Gaming Headset", "Surround sound gaming headset", 129.99, "Electronics", 35),
+        ("p017", "Monitor", "27-inch 4K LED monitor", 349.99, "Electronics", 20),
+        ("p018", "SSD Drive", "1TB NVMe SSD for fast storage", 99.99, "Electronics", 65),
+        ("p019", "RAM Module", "16GB DDR4 RAM module", 69.99, "Electronics", 50),
+        ("p020", "Cooling Pad", "Laptop cooling pad with fans", 34.99, "Accessories", 100),
+        ("p021", "USB Hub", "7-port USB 3.0 hub", 19.99, "Accessories", 110),
+        ("p022", "HDMI Cable", "High-speed HDMI 2.0 cable", 12.99, "Accessories", 200),
+        ("p023", "Ethernet Cable", "Cat6 Ethernet cable 10ft", 8.99, "Accessories", 250),
+        ("p024", "WiFi Adapter", "USB WiFi adapter AC1200", 24.99, "Electronics", 85),
+        ("p025", "External Hard Drive", "2TB portable external hard drive", 79.99, "Electronics", 40),
     ]
 
 
@@ -0,0 +1,94 @@
+"""
+Single-writer queue for CartUp database writes
+Writes from every tool call are funneled to one background thread, which runs whatever
+is queued inside a single transaction, so a burst of writes shares one commit
+"""
+
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, ContextManager, List, Optional, Tuple
+
+# Most statements committed together in one transaction
+MAX_BATCH = 64
+
+# How long the writer waits for more statements before committing what it has (seconds)
+BATCH_WAIT = 0.002
+
+_WriteJob = Tuple[str, Tuple[Any, ...], Future]
+
+
+class BatchWriter:
+    """Background thread that executes queued write statements in batched transactions."""
+
+    def __init__(self, connection: Callable[[], ContextManager[sqlite3.Connection]],
+                 max_batch: int = MAX_BATCH, batch_wait: float = BATCH_WAIT) -> None:
+        self._connection = connection
+        self._max_batch = max_batch
+        self._batch_wait = batch_wait
+        self._queue: "queue.Queue[_WriteJob]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, sql: str, params: Tuple[Any, ...] = ()) -> Future:
+        """
+        Queue a write statement.
+
+        Returns:
+            Future resolving once the statement's batch is committed: to the rows of a
+            RETURNING clause, otherwise to the number of rows changed
+        """
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((sql, params, future))
+        return future
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="cartup-db-writer", daemon=True)
+                self._thread.start()
+
+    def _next_batch(self) -> List[_WriteJob]:
+        """Block for the next statement, then take whatever else arrives shortly after."""
+        batch = [self._queue.get()]
+        while len(batch) < self._max_batch:
+            try:
+                batch.append(self._queue.get(timeout=self._batch_wait))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            results = []
+            try:
+                with self._connection() as conn:
+                    conn.execute("BEGIN")
+                    for sql, params, future in batch:
+                        # A savepoint per statement, so one failing write does not undo
+                        # the rest of the batch
+                        conn.execute("SAVEPOINT batch_write")
+                        try:
+                            cursor = conn.execute(sql, params)
+                            result = cursor.fetchall() if cursor.description else cursor.rowcount
+                        except Exception as e:
+                            conn.execute("ROLLBACK TO batch_write")
+                            result = e
+                        conn.execute("RELEASE batch_write")
+                        results.append((future, result))
+            except Exception as e:
+                # The commit itself failed: nothing in the batch was written
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for future, result in results:
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
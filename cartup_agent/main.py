@@ -7,12 +7,15 @@ from dotenv import load_dotenv
 load_dotenv(".env")
 
 import logging
+import re
 from livekit import agents
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import AgentSession
 from livekit.agents import UserStateChangedEvent
-from livekit.plugins import google, openai, silero, noise_cancellation
+from livekit.plugins import noise_cancellation
+from livekit.plugins.turn_detector.multilingual import MultilingualModel
 from livekit.agents import RoomInputOptions
+from .config import get_session_llm, get_stt_for_language, get_tts_for_language, warmup_vad
 from .database.db import init_database
 from .session.user_data import UserData
 from .agents.greeter_agent import GreeterAgent
@@ -24,39 +27,40 @@ from .agents.recommend_agent import RecommendAgent
 logger = logging.getLogger("cartup-agent")
 logger.setLevel(logging.INFO)
 
+# A supported language code as one "_"-separated part of the room name
+_ROOM_LANGUAGE_RE = re.compile(r"(?:^|_)(en-IN|bn-BD)(?=_|$)")
+
+
+def prewarm(proc: JobProcess):
+    """Load (and warm up) the VAD and build the shared LLM and per-language TTS once per job process."""
+    proc.userdata["vad"] = warmup_vad()
+    get_session_llm()
+    get_tts_for_language("en-IN")
+    get_tts_for_language("bn-BD", gender="female")
+
 
 async def entrypoint(ctx: JobContext):
     """Entry point for the CartUp voice agent."""
-    logger.info(f"CartUp agent started in room: {ctx.room.name}")
+    logger.info("CartUp agent started in room: %s", ctx.room.name)
     
     # Extract language from room name
     # Room name pattern: "voice_assistant_room_{language}_{random}"
-    room_name_parts = ctx.room.name.split('_')
-    language = "en-IN"  # Default fallback
-    
-    # Try to extract language from room name
-    if len(room_name_parts) >= 4 and room_name_parts[-2] in ["en-IN", "bn-BD"]:
-        language = room_name_parts[-2]
-    elif len(room_name_parts) >= 3:
-        # Fallback: check if any part matches language codes
-        for part in room_name_parts:
-            if part in ["en-IN", "bn-BD"]:
-                language = part
-                break
+    match = _ROOM_LANGUAGE_RE.search(ctx.room.name)
+    language = match.group(1) if match else "en-IN"  # Default fallback
     
-    logger.info(f"Detected language from room name: {language}")
+    logger.debug("Detected language from room name: %s", language)
     
     # Initialize database with sample data
     init_database()
-    logger.info("Database initialized")
+    logger.debug("Database initialized")
     
     # Create session state
     userdata = UserData()
     userdata.language = language  # Set language upfront
-    logger.info(f"Setting userdata.language = {language}")
+    logger.debug("Setting userdata.language = %s", language)
     
     # Instantiate all agents with language-aware TTS
-    logger.info(f"Instantiating agents with language: {language}")
+    logger.debug("Instantiating agents with language: %s", language)
     userdata.agents.update({
         "greeter": GreeterAgent(language=language),
         "order": OrderAgent(language=language),
@@ -64,47 +68,35 @@ async def entrypoint(ctx: JobContext):
         "returns": ReturnAgent(language=language),
         "recommend": RecommendAgent(language=language),
     })
-    logger.info(f"All agents instantiated with dynamic TTS (language: {language})")
-    
-    # Configure STT based on selected language
-    if language == "bn-BD":
-        # Bengali STT configuration
-        stt_config = google.STT(
-            model="chirp_2",  # Bengali model
-            location="asia-northeast1",  # Required location for chirp_2 with Bengali support
-            languages=["bn-BD"],  # Bangladesh Bengali
-            detect_language=False,  # Disable auto-detection since we know the language
-        )
-        logger.info("Configured STT for Bengali (bn-BD)")
-    else:
-        # English STT configuration
-        stt_config = google.STT(
-            model="chirp_2",  # English model (verify available models)
-            location="asia-northeast1",  # May need different location for English
-            languages=["en-IN"],  # English (India)
-            detect_language=False,  # Disable auto-detection
-        )
-        logger.info("Configured STT for English (en-IN)")
+    logger.debug("All agents instantiated with dynamic TTS (language: %s)", language)
     
-    # Configure TTS based on selected language (same approach as STT)
-    from .config import get_tts_for_language
+    # STT is built per session; TTS instances are shared per language across the sessions of this process
+    stt_config = get_stt_for_language(language)
+    logger.debug("Configured STT for %s", language)
     
     if language == "bn-BD":
         # Bengali TTS configuration - using bn-IN voices with Bangladesh accent via LLM instructions
         tts_config = get_tts_for_language("bn-BD", gender="female")  # Default to female voice (bn-IN-Chirp3-HD-Despina)
-        logger.info("Configured TTS for Bengali (bn-IN voices) - Bangladesh accent maintained via LLM")
+        logger.debug("Configured TTS for Bengali (bn-IN voices) - Bangladesh accent maintained via LLM")
     else:
         # English TTS configuration
         tts_config = get_tts_for_language("en-IN")
-        logger.info("Configured TTS for English (en-IN)")
+        logger.debug("Configured TTS for English (en-IN)")
     
     # Configure voice pipeline with faster interruption detection
     session = AgentSession[UserData](
         userdata=userdata,
         stt=stt_config,
-        llm=openai.LLM(model="gpt-4o-mini"),
+        llm=get_session_llm(),
         tts=tts_config,  # Language-aware TTS configuration
-        vad=silero.VAD.load(),
+        vad=ctx.proc.userdata["vad"],
+        # End-of-turn model on the transcript; for languages it doesn't cover the session
+        # falls back to VAD silence plus min_endpointing_delay
+        turn_detection=MultilingualModel(),
+        min_endpointing_delay=0.3,  # Reply sooner once the turn looks finished (default: 0.5)
+        max_endpointing_delay=3.0,  # Cap the wait when the model expects more speech (default: 6.0)
+        # Start the LLM reply on the final transcript, before endpointing has confirmed the turn
+        preemptive_generation=True,
         max_tool_steps=5,
         # Faster interruption detection to minimize leftover words
         min_interruption_duration=0.4,  # Lower threshold for faster interruption (default: 0.5)
@@ -123,7 +115,7 @@ async def entrypoint(ctx: JobContext):
                 session.interrupt()
                 logger.debug("Interrupted agent speech due to user speaking")
             except Exception as e:
-                logger.warning(f"Error interrupting session: {e}")
+                logger.warning("Error interrupting session: %s", e)
     
     # Start session with greeter agent
     await session.start(
@@ -134,10 +126,10 @@ async def entrypoint(ctx: JobContext):
         ),
     )
     
-    logger.info(f"Session started with greeter agent (Language: {language})")
+    logger.info("Session started with greeter agent (Language: %s)", language)
 
 
 if __name__ == "__main__":
     # Run the agent using LiveKit CLI
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
 
@@ -0,0 +1,53 @@
+"""
+Sentence tokenizer for streaming TTS that understands the Bengali full stop (দাঁড়ি, U+0964)
+The default blingfire tokenizer only splits on Latin punctuation, so a Bengali reply was
+held back until the LLM finished instead of being synthesized sentence by sentence
+"""
+
+import functools
+import re
+from typing import List, Optional, Tuple
+
+from livekit.agents.tokenize import SentenceStream, SentenceTokenizer, token_stream
+
+# Sentence end: one or more terminators followed by whitespace or the end of the text
+_SENTENCE_END = re.compile(r"[।.!?]+(?=\s|$)")
+
+# Same defaults as the plugin's blingfire tokenizer
+MIN_SENTENCE_LEN = 20
+STREAM_CONTEXT_LEN = 10
+
+
+def _split_sentences(text: str, min_sentence_len: int) -> List[Tuple[str, int, int]]:
+    """Split text into (sentence, start, end) tuples; short sentences merge into the next."""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        sentence = text[start:match.end()].strip()
+        if len(sentence) < min_sentence_len:
+            continue
+        sentences.append((sentence, start, match.end()))
+        start = match.end()
+
+    rest = text[start:].strip()
+    if rest:
+        sentences.append((rest, start, len(text)))
+    return sentences
+
+
+class BengaliSentenceTokenizer(SentenceTokenizer):
+    """Splits on '।' as well as '.', '!' and '?' (Bengali replies often mix both)."""
+
+    def __init__(self, *, min_sentence_len: int = MIN_SENTENCE_LEN, stream_context_len: int = STREAM_CONTEXT_LEN) -> None:
+        self._min_sentence_len = min_sentence_len
+        self._stream_context_len = stream_context_len
+
+    def tokenize(self, text: str, *, language: Optional[str] = None) -> List[str]:
+        return [sentence for sentence, _, _ in _split_sentences(text, self._min_sentence_len)]
+
+    def stream(self, *, language: Optional[str] = None) -> SentenceStream:
+        return token_stream.BufferedSentenceStream(
+            tokenizer=functools.partial(_split_sentences, min_sentence_len=self._min_sentence_len),
+            min_token_len=self._min_sentence_len,
+            min_ctx_len=self._stream_context_len,
+        )
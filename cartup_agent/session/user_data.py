@@ -3,14 +3,29 @@ Session state management for CartUp voice agent
 Contains UserData dataclass and type aliases
 """
 
+import sys
 from dataclasses import dataclass, field
 from typing import Optional, Dict
-import yaml
 
 from livekit.agents.voice import Agent, RunContext
 
+# Fields that appear in UserData.summarize(); assigning any of them drops the cached text
+_SUMMARY_FIELDS = frozenset({
+    "user_id",
+    "current_order_id",
+    "current_ticket_id",
+    "current_product_id",
+    "last_intent",
+    "language",
+})
 
-@dataclass
+
+# One UserData per live session: __slots__ instead of a per-instance __dict__
+# (dataclass(slots=...) needs Python 3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class UserData:
     """Session state that persists across agent transfers."""
     
@@ -32,17 +47,30 @@ class UserData:
     agents: Dict[str, Agent] = field(default_factory=dict)
     prev_agent: Optional[Agent] = None
     
+    # Rendered summary, reused until one of the summarized fields is assigned
+    _summary: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value) -> None:
+        # Re-assigning the same value (tools routinely re-set user_id / current_*) keeps
+        # the cached summary
+        if name in _SUMMARY_FIELDS and getattr(self, name, None) != value:
+            object.__setattr__(self, "_summary", None)
+        object.__setattr__(self, name, value)
+    
     def summarize(self) -> str:
         """Generate YAML summary of current session state for LLM context."""
-        data = {
-            "user_id": self.user_id or "unknown",
-            "current_order_id": self.current_order_id or "none",
-            "current_ticket_id": self.current_ticket_id or "none",
-            "current_product_id": self.current_product_id or "none",
-            "last_intent": self.last_intent or "none",
-            "language": self.language or "en-IN",  # Default to English if not set (bn-BD for Bangladesh Bengali)
-        }
-        return yaml.dump(data)
+        if self._summary is not None:
+            return self._summary
+        # Fixed shape, so format it directly (same keys and order yaml.dump produced)
+        self._summary = (
+            f"current_order_id: {self.current_order_id or 'none'}\n"
+            f"current_product_id: {self.current_product_id or 'none'}\n"
+            f"current_ticket_id: {self.current_ticket_id or 'none'}\n"
+            f"language: {self.language or 'en-IN'}\n"  # Default to English if not set (bn-BD for Bangladesh Bengali)
+            f"last_intent: {self.last_intent or 'none'}\n"
+            f"user_id: {self.user_id or 'unknown'}\n"
+        )
+        return self._summary
 
 
 # Type alias for RunContext with UserData
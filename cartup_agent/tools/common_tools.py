@@ -6,31 +6,37 @@ from typing import Annotated
 from pydantic import Field
 from livekit.agents.llm import function_tool
 
+from ..agents.base_agent import BaseAgent
 from ..session.user_data import RunContext_T
+from ..utils.helpers import LowerId
 from ..config import get_tts_for_language
 
+# Fixed tool responses per language, so set_language returns identical strings every time
+_LANGUAGE_SET_MESSAGES = {
+    "en-IN": "Language set to English (en-IN). All responses will now be in English with authentic Bangladesh accent and cultural context.",
+    "bn-BD": "Language set to Bengali (Bangladesh) (bn-BD). All responses will now be in Bengali (Bangladesh) with authentic Bangladesh accent and cultural context.",
+}
+_VALID_LANGUAGES = frozenset(_LANGUAGE_SET_MESSAGES)
 
 @function_tool()
 async def set_user(
-    user_id: Annotated[str, Field(description="The authenticated/assumed user id (e.g., u101). Must be lowercase format.")],
+    user_id: Annotated[LowerId, Field(description="The authenticated/assumed user id (e.g., u101). Must be lowercase format.")],
     context: RunContext_T,
 ) -> str:
     """Attach a known user_id to the session (simulates auth / caller lookup)."""
-    # Normalize to lowercase (handles cases where STT/LLM capitalizes IDs)
-    user_id = user_id.lower().strip()
-    context.userdata.user_id = user_id
+    if context.userdata.user_id != user_id:
+        context.userdata.user_id = user_id
     return f"User set to {user_id}"
 
 
 @function_tool()
 async def set_current_order(
-    order_id: Annotated[str, Field(description="Order id to focus on (e.g., o302). Must be lowercase format.")],
+    order_id: Annotated[LowerId, Field(description="Order id to focus on (e.g., o302). Must be lowercase format.")],
     context: RunContext_T,
 ) -> str:
     """Set the focal order id for follow-up queries (track/modify)."""
-    # Normalize to lowercase (handles cases where STT/LLM capitalizes IDs)
-    order_id = order_id.lower().strip()
-    context.userdata.current_order_id = order_id
+    if context.userdata.current_order_id != order_id:
+        context.userdata.current_order_id = order_id
     return f"Current order set to {order_id}"
 
 
@@ -40,8 +46,11 @@ async def set_language(
     context: RunContext_T,
 ) -> str:
     """Set the preferred language for the conversation session."""
-    if language not in ["en-IN", "bn-BD"]:
+    if language not in _VALID_LANGUAGES:
         return f"Invalid language code. Please use 'en-IN' for English or 'bn-BD' for Bangladesh Bengali."
+    if context.userdata.language == language:
+        # Nothing to switch: skip the TTS lookup and session update
+        return _LANGUAGE_SET_MESSAGES[language]
     context.userdata.language = language
     
     # Try to update session TTS if possible (may not be supported)
@@ -58,15 +67,14 @@ async def set_language(
         # If TTS update fails, continue anyway - language preference is set
         pass
     
-    lang_name = "English" if language == "en-IN" else "Bengali (Bangladesh)"
-    return f"Language set to {lang_name} ({language}). All responses will now be in {lang_name} with authentic Bangladesh accent and cultural context."
+    return _LANGUAGE_SET_MESSAGES[language]
 
 
 @function_tool()
 async def to_greeter(context: RunContext_T) -> tuple:
     """Route caller back to the GreeterAgent."""
     curr_agent = context.session.current_agent
-    if hasattr(curr_agent, "_transfer_to_agent"):
+    if isinstance(curr_agent, BaseAgent):  # every CartUp agent; plain Agents can't transfer
         return await curr_agent._transfer_to_agent("greeter", context)
     return curr_agent, "Returning to greeter."
 
@@ -2,23 +2,23 @@
 Order-related tools for CartUp agent
 """
 
+import asyncio
 from typing import Annotated, Dict, Any, List
 from pydantic import Field
 from livekit.agents.llm import function_tool
 
 from ..session.user_data import RunContext_T
-from ..database.db import get_order, get_user, update_order_address
+from ..utils.helpers import LowerId
+from ..database.db import get_order, get_orders_bulk, get_user, update_order_address
 
 
 @function_tool()
 async def get_order_details(
-    order_id: Annotated[str, Field(description="Order ID to fetch (e.g., o302). Must be lowercase format.")],
+    order_id: Annotated[LowerId, Field(description="Order ID to fetch (e.g., o302). Must be lowercase format.")],
     context: RunContext_T,
 ) -> Dict[str, Any]:
     """Fetch order details from database."""
-    # Normalize to lowercase (handles cases where STT/LLM capitalizes IDs)
-    order_id = order_id.lower().strip()
-    order = get_order(order_id)
+    order = await asyncio.to_thread(get_order, order_id)
     if not order:
         return {"error": f"Order {order_id} not found"}
     
@@ -35,29 +35,26 @@ async def get_order_details(
 
 @function_tool()
 async def get_user_orders(
-    user_id: Annotated[str, Field(description="User ID to fetch orders for (e.g., u101). Must be lowercase format.")],
+    user_id: Annotated[LowerId, Field(description="User ID to fetch orders for (e.g., u101). Must be lowercase format.")],
     context: RunContext_T,
 ) -> Dict[str, Any]:
     """Get all orders for a user."""
-    # Normalize to lowercase (handles cases where STT/LLM capitalizes IDs)
-    user_id = user_id.lower().strip()
-    user = get_user(user_id)
+    user = await asyncio.to_thread(get_user, user_id)
     if not user:
         return {"error": f"User {user_id} not found"}
     
-    order_ids = user.get("orders", [])
-    orders = []
-    
-    for order_id in order_ids:
-        order = get_order(order_id)
-        if order:
-            orders.append({
-                "order_id": order_id,
-                "status": order["status"],
-                "items": order["items"],
-                "amount": order["amount"],
-                "delivery_date": order.get("delivery_date"),
-            })
+    # All of the user's orders in one query instead of one lookup per order
+    fetched = await asyncio.to_thread(get_orders_bulk, user.get("orders", []))
+    orders = [
+        {
+            "order_id": order["order_id"],
+            "status": order["status"],
+            "items": order["items"],
+            "amount": order["amount"],
+            "delivery_date": order.get("delivery_date"),
+        }
+        for order in fetched
+    ]
     
     context.userdata.user_id = user_id
     return {
@@ -69,18 +66,16 @@ async def get_user_orders(
 
 @function_tool()
 async def update_delivery_address(
-    order_id: Annotated[str, Field(description="Order ID to update. Must be lowercase format (e.g., o302).")],
+    order_id: Annotated[LowerId, Field(description="Order ID to update. Must be lowercase format (e.g., o302).")],
     new_address: Annotated[str, Field(description="New delivery address")],
     context: RunContext_T,
 ) -> str:
     """Update delivery address for an order (simulated)."""
-    # Normalize to lowercase (handles cases where STT/LLM capitalizes IDs)
-    order_id = order_id.lower().strip()
-    order = get_order(order_id)
+    order = await asyncio.to_thread(get_order, order_id)
     if not order:
         return f"Order {order_id} not found"
     
-    if update_order_address(order_id, new_address):
+    if await asyncio.to_thread(update_order_address, order_id, new_address):
         context.userdata.current_order_id = order_id
         return f"Address for order {order_id} updated to {new_address}"
     else:
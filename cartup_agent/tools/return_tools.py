@@ -2,33 +2,31 @@
 Return and refund tools for CartUp agent
 """
 
+import asyncio
 from typing import Annotated, Dict, Any
 from pydantic import Field
 from livekit.agents.llm import function_tool
 
 from ..session.user_data import RunContext_T
+from ..utils.helpers import LowerId
 from ..database.db import get_order, get_return, create_return_record, update_refund_status as db_update_refund_status
 
 
 @function_tool()
 async def initiate_return(
-    order_id: Annotated[str, Field(description="Order to return. Must be lowercase format (e.g., o302).")],
+    order_id: Annotated[LowerId, Field(description="Order to return. Must be lowercase format (e.g., o302).")],
     reason: Annotated[str, Field(description="Why returning")],
     context: RunContext_T,
 ) -> Dict[str, Any]:
     """Create/overwrite a return record."""
-    # Normalize to lowercase (handles cases where STT/LLM capitalizes IDs)
-    order_id = order_id.lower().strip()
-    order = get_order(order_id)
+    order = await asyncio.to_thread(get_order, order_id)
     if not order:
         return {"error": f"Order {order_id} not found"}
     
-    from datetime import datetime
-    created_at = datetime.now().strftime("%Y-%m-%d")
-    
-    if create_return_record(order_id, reason, "Pending Courier Pickup", "Not Initiated", created_at):
+    # created_at defaults to today's date (cached per day in the database layer)
+    if await asyncio.to_thread(create_return_record, order_id, reason, "Pending Courier Pickup", "Not Initiated"):
         context.userdata.current_order_id = order_id
-        return_record = get_return(order_id)
+        return_record = await asyncio.to_thread(get_return, order_id)
         return {
             "order_id": order_id,
             **return_record,
@@ -39,13 +37,11 @@ async def initiate_return(
 
 @function_tool()
 async def get_return_status(
-    order_id: Annotated[str, Field(description="Order ID. Must be lowercase format (e.g., o302).")],
+    order_id: Annotated[LowerId, Field(description="Order ID. Must be lowercase format (e.g., o302).")],
     context: RunContext_T,
 ) -> Dict[str, Any]:
     """Return current return status (if any)."""
-    # Normalize to lowercase (handles cases where STT/LLM capitalizes IDs)
-    order_id = order_id.lower().strip()
-    return_record = get_return(order_id)
+    return_record = await asyncio.to_thread(get_return, order_id)
     if not return_record:
         return {"error": f"No return found for order {order_id}"}
     
@@ -58,18 +54,16 @@ async def get_return_status(
 
 @function_tool()
 async def update_refund_status(
-    order_id: Annotated[str, Field(description="Order ID. Must be lowercase format (e.g., o302).")],
+    order_id: Annotated[LowerId, Field(description="Order ID. Must be lowercase format (e.g., o302).")],
     refund_status: Annotated[str, Field(description="New refund status")],
     context: RunContext_T,
 ) -> str:
     """Simulate refund progress update."""
-    # Normalize to lowercase (handles cases where STT/LLM capitalizes IDs)
-    order_id = order_id.lower().strip()
-    return_record = get_return(order_id)
+    return_record = await asyncio.to_thread(get_return, order_id)
     if not return_record:
         return f"No return found for order {order_id}"
     
-    if db_update_refund_status(order_id, refund_status):
+    if await asyncio.to_thread(db_update_refund_status, order_id, refund_status):
         context.userdata.current_order_id = order_id
         return f"Refund status for order {order_id} set to {refund_status}"
     else:
@@ -0,0 +1,201 @@
+"""
+Two-tier cache for synthesized TTS audio of fixed phrases (welcome / transfer greetings)
+Lets the first turn of a session play straight from memory or disk instead of waiting on
+synthesis; entries are content-addressed by voice, rate and text
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+import wave
+from collections import OrderedDict
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from livekit import rtc
+from livekit.agents import tts
+
+logger = logging.getLogger("cartup-agent")
+
+# Cache path (generated audio, ignored by git)
+CACHE_DIR = Path(__file__).parent / "data" / "tts_cache"
+
+# Length of each frame streamed back from a cached file
+FRAME_DURATION_MS = 100
+
+# Phrases kept decoded in memory; the least recently played are evicted first
+MEMORY_CACHE_SIZE = 256
+
+
+def _cache_key(tts_engine: tts.TTS, text: str) -> str:
+    """Build the cache key from the text and everything that changes how it sounds."""
+    opts = getattr(tts_engine, "_opts", None)
+    voice = getattr(opts, "voice", None)
+    parts = [
+        tts_engine.label,
+        getattr(voice, "name", ""),
+        getattr(voice, "language_code", ""),
+        str(getattr(opts, "speaking_rate", "")),
+        str(tts_engine.sample_rate),
+        text,
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _read_wav(path: Path) -> Optional[List[rtc.AudioFrame]]:
+    """Load a cached wav file and split it into frames."""
+    try:
+        with wave.open(str(path), "rb") as wav:
+            sample_rate = wav.getframerate()
+            num_channels = wav.getnchannels()
+            pcm = wav.readframes(wav.getnframes())
+    except (OSError, wave.Error, EOFError):
+        return None
+
+    samples_per_frame = sample_rate * FRAME_DURATION_MS // 1000
+    frame_bytes = samples_per_frame * num_channels * 2
+    frames = []
+    for offset in range(0, len(pcm), frame_bytes):
+        chunk = pcm[offset:offset + frame_bytes]
+        frames.append(
+            rtc.AudioFrame(
+                data=chunk,
+                sample_rate=sample_rate,
+                num_channels=num_channels,
+                samples_per_channel=len(chunk) // (num_channels * 2),
+            )
+        )
+    return frames
+
+
+def _write_wav(path: Path, frames: List[rtc.AudioFrame]) -> None:
+    """Persist synthesized frames as a 16-bit wav file (atomically)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # A unique temp name, so concurrent writers of the same entry never share a file
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f, wave.open(f, "wb") as wav:
+            wav.setnchannels(frames[0].num_channels)
+            wav.setsampwidth(2)
+            wav.setframerate(frames[0].sample_rate)
+            for frame in frames:
+                wav.writeframes(bytes(frame.data))
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+async def _persist(path: Path, frames: List[rtc.AudioFrame]) -> None:
+    """Write frames to the cache without letting disk errors break playback."""
+    if not frames:
+        return
+    try:
+        await asyncio.to_thread(_write_wav, path, frames)
+    except OSError as e:
+        logger.warning("Could not write TTS cache entry %s: %s", path.name, e)
+
+
+# Decoded frames of recently played phrases, keyed by cache key
+_memory: "OrderedDict[str, List[rtc.AudioFrame]]" = OrderedDict()
+
+
+def _remember(key: str, frames: List[rtc.AudioFrame]) -> None:
+    """Keep frames in the in-memory tier, evicting the least recently used phrase."""
+    if not frames:
+        return
+    _memory[key] = frames
+    _memory.move_to_end(key)
+    if len(_memory) > MEMORY_CACHE_SIZE:
+        _memory.popitem(last=False)
+
+
+# Prefetches still synthesizing, keyed by cache key
+_inflight: Dict[str, "asyncio.Task[List[rtc.AudioFrame]]"] = {}
+
+
+async def _synthesize_to_cache(tts_engine: tts.TTS, text: str, key: str, path: Path) -> List[rtc.AudioFrame]:
+    """Synthesize a phrase fully and persist it; returns the frames."""
+    frames = []
+    async with tts_engine.synthesize(text) as stream:
+        async for audio in stream:
+            frames.append(audio.frame)
+
+    _remember(key, frames)
+    await _persist(path, frames)
+    return frames
+
+
+def prefetch(tts_engine: tts.TTS, text: str) -> None:
+    """
+    Start synthesizing a phrase in the background if it is not cached yet.
+
+    A later cached_audio() call for the same phrase waits on this instead of starting
+    its own synthesis.
+    """
+    key = _cache_key(tts_engine, text)
+    path = CACHE_DIR / f"{key}.wav"
+    if key in _memory or key in _inflight or path.exists():
+        return
+
+    def _on_done(task: asyncio.Task) -> None:
+        _inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("TTS prefetch failed for %s: %s", path.name, task.exception())
+
+    task = asyncio.create_task(_synthesize_to_cache(tts_engine, text, key, path))
+    _inflight[key] = task
+    task.add_done_callback(_on_done)
+
+
+async def cached_audio(tts_engine: tts.TTS, text: str) -> AsyncIterator[rtc.AudioFrame]:
+    """
+    Yield audio frames for a fixed phrase, synthesizing and persisting it on a cache miss.
+
+    Args:
+        tts_engine: TTS instance that would normally speak the phrase
+        text: Exact text to speak
+
+    Returns:
+        Async iterator of audio frames, suitable for session.say(text, audio=...)
+    """
+    key = _cache_key(tts_engine, text)
+    path = CACHE_DIR / f"{key}.wav"
+
+    frames = _memory.get(key)
+    if frames:
+        _memory.move_to_end(key)
+        for frame in frames:
+            yield frame
+        return
+
+    task = _inflight.get(key)
+    if task is not None:
+        try:
+            frames = await asyncio.shield(task)
+        except Exception:
+            frames = None  # already logged by the prefetch; synthesize again below
+        if frames:
+            for frame in frames:
+                yield frame
+            return
+
+    frames = await asyncio.to_thread(_read_wav, path) if path.exists() else None
+    if frames:
+        _remember(key, frames)
+        for frame in frames:
+            yield frame
+        return
+
+    frames = []
+    async with tts_engine.synthesize(text) as stream:
+        async for audio in stream:
+            frames.append(audio.frame)
+            yield audio.frame
+
+    _remember(key, frames)
+    await _persist(path, frames)
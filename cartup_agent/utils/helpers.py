@@ -2,7 +2,25 @@
 Helper utility functions for CartUp agent
 """
 
+from typing import Any
+
+from pydantic import GetCoreSchemaHandler
+from pydantic_core import core_schema
+
 from ..database.db import _next_id
 
-__all__ = ["_next_id"]
+__all__ = ["_next_id", "LowerId"]
+
+
+class LowerId(str):
+    """
+    Entity ID tool argument (u101, o302, p001, t501), normalized during argument validation.
+
+    STT/LLM output often capitalizes or pads IDs; stored IDs are lowercase. Kept as the
+    argument's own type (not Annotated metadata) because function tools only carry over
+    the base type and the Field of an Annotated parameter.
+    """
 
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.str_schema(strip_whitespace=True, to_lower=True)
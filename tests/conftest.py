@@ -0,0 +1,22 @@
+"""
+Shared fixtures for the CartUp agent tests
+"""
+
+import threading
+
+import pytest
+
+from cartup_agent.database import db
+
+
+@pytest.fixture
+def tmp_db(tmp_path, monkeypatch):
+    """Point the database module at an empty directory, with fresh connections and caches."""
+    monkeypatch.setattr(db, "DB_DIR", tmp_path)
+    monkeypatch.setattr(db, "DB_PATH", tmp_path / "cartup.db")
+    # Pooled connections are per thread, including the writer thread's
+    monkeypatch.setattr(db, "_local", threading.local())
+    monkeypatch.setattr(db, "_initialized", False)
+    for cache in (db._user_cache, db._order_cache, db._product_cache):
+        cache._data.clear()
+    return db.DB_PATH
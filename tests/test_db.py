@@ -0,0 +1,81 @@
+"""
+Tests for the SQLite database helpers
+"""
+
+import pytest
+
+from cartup_agent.database import db
+
+
+@pytest.fixture
+def seeded_db(tmp_db):
+    db.init_database()
+    return tmp_db
+
+
+@pytest.fixture
+def tmp_db_with_hash(tmp_path, tmp_db, monkeypatch):
+    data_dir = tmp_path / "data #1"
+    monkeypatch.setattr(db, "DB_DIR", data_dir)
+    monkeypatch.setattr(db, "DB_PATH", data_dir / "cartup.db")
+    return db.DB_PATH
+
+
+def test_read_only_connection_opens_path_with_uri_characters(tmp_db_with_hash):
+    db.init_database()
+
+    assert db.get_user("u101") is not None
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(db.time, "monotonic", lambda: now[0])
+    cache = db._TTLCache(maxsize=4, ttl=30.0)
+    cache.put("o1", {"order_id": "o1"}, cache.version("o1"))
+
+    now[0] += 29.0
+    assert cache.get("o1") == {"order_id": "o1"}
+    now[0] += 2.0
+    assert cache.get("o1") is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = db._TTLCache(maxsize=2, ttl=30.0)
+    for key in ("a", "b"):
+        cache.put(key, {"id": key}, cache.version(key))
+    cache.get("a")
+    cache.put("c", {"id": "c"}, cache.version("c"))
+
+    assert cache.get("a") == {"id": "a"}
+    assert cache.get("b") is None
+    assert cache.get("c") == {"id": "c"}
+
+
+def test_ttl_cache_drops_put_of_value_read_before_pop():
+    cache = db._TTLCache(maxsize=4, ttl=30.0)
+    version = cache.version("o1")  # a reader starts...
+    cache.pop("o1")  # ...a write lands and invalidates the key...
+    cache.put("o1", {"address": "old"}, version)  # ...then the reader finishes
+
+    assert cache.get("o1") is None
+    cache.put("o1", {"address": "new"}, cache.version("o1"))
+    assert cache.get("o1") == {"address": "new"}
+
+
+def test_ttl_cache_evicted_version_still_outdates_pending_reads():
+    cache = db._TTLCache(maxsize=2, ttl=30.0)
+    version = cache.version("o1")
+    for key in ("o1", "o2", "o3"):  # the version of o1 is evicted
+        cache.pop(key)
+    cache.put("o1", {"address": "old"}, version)
+
+    assert cache.get("o1") is None
+
+
+def test_update_order_address_invalidates_cached_order(seeded_db):
+    order = db.get_order("o302")
+    assert db.get_order("o302") is order  # served from the cache
+
+    assert db.update_order_address("o302", "House 7, Road 2, Dhaka")
+
+    assert db.get_order("o302")["address"] == "House 7, Road 2, Dhaka"
@@ -0,0 +1,116 @@
+"""
+Tests for bringing databases created with the original schema up to date
+"""
+
+import sqlite3
+
+import pytest
+
+from cartup_agent.database import db
+
+# Schema as first released: items named their product instead of referencing it, and
+# products stored in_stock instead of deriving it from stock_quantity
+_BASELINE_SCHEMA = """
+    CREATE TABLE users (
+        user_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        phone TEXT,
+        email TEXT,
+        created_at TEXT
+    );
+    CREATE TABLE products (
+        product_id TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        description TEXT,
+        price REAL NOT NULL,
+        category TEXT,
+        in_stock INTEGER DEFAULT 1,
+        stock_quantity INTEGER DEFAULT 0
+    );
+    CREATE TABLE orders (
+        order_id TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        amount REAL NOT NULL,
+        delivery_date TEXT,
+        address TEXT,
+        created_at TEXT,
+        FOREIGN KEY (user_id) REFERENCES users(user_id)
+    );
+    CREATE TABLE order_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        order_id TEXT NOT NULL,
+        product_name TEXT NOT NULL,
+        quantity INTEGER DEFAULT 1,
+        FOREIGN KEY (order_id) REFERENCES orders(order_id)
+    );
+    INSERT INTO users VALUES ('u1', 'Asha', NULL, NULL, '2025-01-01');
+    INSERT INTO products (product_id, name, price, stock_quantity) VALUES
+        ('p1', 'Phone', 100.0, 5),
+        ('p2', 'Case', 5.0, 0),
+        ('p3', 'Case', 6.0, 2);
+    INSERT INTO orders VALUES
+        ('o1', 'u1', 'Shipped', 105.0, '2025-01-05', 'Dhaka', '2025-01-02');
+"""
+
+
+def _make_baseline_db(path, items):
+    conn = sqlite3.connect(path)
+    conn.executescript(_BASELINE_SCHEMA)
+    conn.executemany(
+        "INSERT INTO order_items (id, order_id, product_name, quantity) VALUES (?, ?, ?, ?)", items
+    )
+    conn.commit()
+    conn.close()
+
+
+def _order_items(path):
+    conn = sqlite3.connect(path)
+    try:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(order_items)")]
+        rows = conn.execute("SELECT * FROM order_items ORDER BY id").fetchall()
+        return columns, rows
+    finally:
+        conn.close()
+
+
+def test_migrates_product_names_to_ids(tmp_db):
+    _make_baseline_db(tmp_db, [(1, "o1", "Phone", 1), (2, "o1", "Case", 2)])
+
+    db.init_database()
+
+    columns, rows = _order_items(tmp_db)
+    assert columns == ["id", "order_id", "product_id", "quantity"]
+    # A name shared by two products resolves to the lowest product ID, once
+    assert rows == [(1, "o1", "p1", 1), (2, "o1", "p2", 2)]
+    assert db.get_order("o1")["items"] == ["Phone", "Case"]
+
+
+def test_unknown_product_name_aborts_without_losing_items(tmp_db):
+    items = [(1, "o1", "Phone", 1), (2, "o1", "Charger", 1)]
+    _make_baseline_db(tmp_db, items)
+
+    with pytest.raises(sqlite3.IntegrityError, match="Charger"):
+        db.init_database()
+
+    columns, rows = _order_items(tmp_db)
+    assert columns == ["id", "order_id", "product_name", "quantity"]
+    assert rows == items
+
+
+def test_products_derive_in_stock_after_migration(tmp_db):
+    _make_baseline_db(tmp_db, [(1, "o1", "Phone", 1)])
+
+    db.init_database()
+
+    # The baseline stored in_stock = 1 for every product, even p2 with no stock
+    assert db.get_product("p1")["in_stock"] is True
+    assert db.get_product("p2")["in_stock"] is False
+    conn = sqlite3.connect(tmp_db)
+    try:
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        references = {row[2] for row in conn.execute("PRAGMA foreign_key_list(order_items)")}
+    finally:
+        conn.close()
+    assert "products_old" not in tables
+    assert "products" in references
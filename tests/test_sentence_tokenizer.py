@@ -0,0 +1,51 @@
+"""
+Tests for the Bengali-aware sentence tokenizer
+"""
+
+from cartup_agent.sentence_tokenizer import BengaliSentenceTokenizer
+
+_BENGALI_REPLY = (
+    "আপনার অর্ডারটি আজ সন্ধ্যায় পৌঁছে যাবে। "
+    "ডেলিভারির ঠিকানা পরিবর্তন করতে চাইলে আমাকে জানান। "
+    "ধন্যবাদ!"
+)
+
+
+def test_tokenize_splits_on_bengali_full_stop():
+    tokenizer = BengaliSentenceTokenizer(min_sentence_len=10)
+
+    assert tokenizer.tokenize(_BENGALI_REPLY) == [
+        "আপনার অর্ডারটি আজ সন্ধ্যায় পৌঁছে যাবে।",
+        "ডেলিভারির ঠিকানা পরিবর্তন করতে চাইলে আমাকে জানান।",
+        "ধন্যবাদ!",  # too short to stand alone, but nothing follows it
+    ]
+
+
+def test_tokenize_merges_short_sentences_into_the_next():
+    tokenizer = BengaliSentenceTokenizer(min_sentence_len=20)
+
+    assert tokenizer.tokenize("Hi. Your order o302 is on its way. ঠিক আছে।") == [
+        "Hi. Your order o302 is on its way.",
+        "ঠিক আছে।",
+    ]
+
+
+def test_tokenize_keeps_decimals_and_unterminated_text():
+    tokenizer = BengaliSentenceTokenizer(min_sentence_len=5)
+
+    assert tokenizer.tokenize("The total is 3.5 thousand taka. And the rest") == [
+        "The total is 3.5 thousand taka.",
+        "And the rest",
+    ]
+
+
+async def test_stream_emits_sentences_as_text_arrives():
+    tokenizer = BengaliSentenceTokenizer(min_sentence_len=10, stream_context_len=5)
+    stream = tokenizer.stream()
+    for chunk in (_BENGALI_REPLY[:25], _BENGALI_REPLY[25:60], _BENGALI_REPLY[60:]):
+        stream.push_text(chunk)
+    stream.end_input()
+
+    tokens = [data.token async for data in stream]
+
+    assert tokens == tokenizer.tokenize(_BENGALI_REPLY)
@@ -0,0 +1,117 @@
+"""
+Tests for the fixed-phrase TTS audio cache
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from livekit import rtc
+
+from cartup_agent import tts_cache
+
+_SAMPLE_RATE = 16000
+
+
+class _FakeTTS:
+    """Stands in for a TTS plugin: each synthesis yields two 100 ms frames of one value."""
+
+    label = "tests.FakeTTS"
+    sample_rate = _SAMPLE_RATE
+
+    def __init__(self, voice: str = "en-IN-Chirp-HD-F", speaking_rate: float = 1.2) -> None:
+        self._opts = SimpleNamespace(
+            voice=SimpleNamespace(name=voice, language_code="en-IN"),
+            speaking_rate=speaking_rate,
+        )
+        self.calls = []
+
+    @asynccontextmanager
+    async def _stream(self, text: str):
+        self.calls.append(text)
+
+        async def frames():
+            await asyncio.sleep(0)
+            for value in (1, 2):
+                frame = rtc.AudioFrame(
+                    data=value.to_bytes(2, "little", signed=True) * (_SAMPLE_RATE // 10),
+                    sample_rate=_SAMPLE_RATE,
+                    num_channels=1,
+                    samples_per_channel=_SAMPLE_RATE // 10,
+                )
+                yield SimpleNamespace(frame=frame)
+
+        yield frames()
+
+    def synthesize(self, text: str):
+        return self._stream(text)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tts_cache, "CACHE_DIR", tmp_path)
+    tts_cache._memory.clear()
+    tts_cache._inflight.clear()
+    yield tmp_path
+    tts_cache._memory.clear()
+
+
+async def _play(tts_engine, text):
+    return [bytes(frame.data) async for frame in tts_cache.cached_audio(tts_engine, text)]
+
+
+def test_cache_key_covers_voice_rate_and_text():
+    key = tts_cache._cache_key(_FakeTTS(), "Hello")
+
+    assert key == tts_cache._cache_key(_FakeTTS(), "Hello")
+    assert key != tts_cache._cache_key(_FakeTTS(), "Hello!")
+    assert key != tts_cache._cache_key(_FakeTTS(voice="en-IN-Chirp-HD-D"), "Hello")
+    assert key != tts_cache._cache_key(_FakeTTS(speaking_rate=1.0), "Hello")
+
+
+async def test_miss_synthesizes_once_then_plays_from_memory_and_disk(cache_dir):
+    tts_engine = _FakeTTS()
+
+    first = await _play(tts_engine, "Welcome")
+    assert len(first) == 2
+    assert [path.suffix for path in cache_dir.iterdir()] == [".wav"]
+
+    assert await _play(tts_engine, "Welcome") == first  # memory
+    tts_cache._memory.clear()
+    assert await _play(tts_engine, "Welcome") == first  # disk
+    assert tts_engine.calls == ["Welcome"]
+
+
+async def test_playback_waits_on_a_running_prefetch():
+    tts_engine = _FakeTTS()
+
+    tts_cache.prefetch(tts_engine, "Transferring")
+    frames = await _play(tts_engine, "Transferring")
+
+    assert len(frames) == 2
+    assert tts_engine.calls == ["Transferring"]
+
+
+async def test_disk_errors_do_not_break_playback(cache_dir, monkeypatch, caplog):
+    def _fail(path, frames):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(tts_cache, "_write_wav", _fail)
+
+    with caplog.at_level(logging.WARNING, logger="cartup-agent"):
+        frames = await _play(_FakeTTS(), "Welcome")
+
+    assert len(frames) == 2
+    assert "Could not write TTS cache entry" in caplog.text
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_failed_write_leaves_no_temp_file(cache_dir):
+    bad_frame = SimpleNamespace(num_channels=1, sample_rate=_SAMPLE_RATE, data=None)
+
+    with pytest.raises(TypeError):
+        tts_cache._write_wav(cache_dir / "entry.wav", [bad_frame])
+
+    assert list(cache_dir.iterdir()) == []
@@ -0,0 +1,101 @@
+"""
+Tests for the batched single-writer queue
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+
+from cartup_agent.database.writer import BatchWriter
+
+# Long enough that statements submitted back to back share one batch
+_BATCH_WAIT = 0.2
+
+
+class _Database:
+    """One connection used like db.get_connection(): commit on exit, roll back on error."""
+
+    def __init__(self, path) -> None:
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript("""
+            CREATE TABLE parents (id TEXT PRIMARY KEY);
+            CREATE TABLE children (
+                id INTEGER PRIMARY KEY,
+                parent_id TEXT REFERENCES parents(id) DEFERRABLE INITIALLY DEFERRED
+            );
+        """)
+        self.transactions = 0
+
+    @contextmanager
+    def connection(self):
+        self.transactions += 1
+        try:
+            yield self.conn
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def parents(self):
+        return [row[0] for row in self.conn.execute("SELECT id FROM parents ORDER BY id")]
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = _Database(tmp_path / "writer.db")
+    yield database
+    database.conn.close()
+
+
+@pytest.fixture
+def writer(database):
+    return BatchWriter(database.connection, batch_wait=_BATCH_WAIT)
+
+
+def test_failing_statement_rolls_back_only_itself(database, writer):
+    first = writer.submit("INSERT INTO parents (id) VALUES (?)", ("a",))
+    # Inserts 'x', then fails on the duplicate 'a': neither row may be kept
+    failing = writer.submit("INSERT INTO parents (id) VALUES ('x'), ('a')")
+    last = writer.submit("INSERT INTO parents (id) VALUES (?)", ("b",))
+
+    assert first.result(timeout=5) == 1
+    with pytest.raises(sqlite3.IntegrityError):
+        failing.result(timeout=5)
+    assert last.result(timeout=5) == 1
+    assert database.transactions == 1
+    assert database.parents() == ["a", "b"]
+
+
+def test_commit_failure_fails_every_statement_in_the_batch(database, writer):
+    futures = [
+        writer.submit("INSERT INTO parents (id) VALUES (?)", ("a",)),
+        # The foreign key is deferred, so this statement succeeds and COMMIT fails
+        writer.submit("INSERT INTO children (parent_id) VALUES (?)", ("missing",)),
+        writer.submit("INSERT INTO parents (id) VALUES (?)", ("b",)),
+    ]
+
+    for future in futures:
+        with pytest.raises(sqlite3.IntegrityError):
+            future.result(timeout=5)
+    assert database.transactions == 1
+    assert database.parents() == []
+
+
+def test_writer_keeps_running_after_a_failed_commit(database, writer):
+    with pytest.raises(sqlite3.IntegrityError):
+        writer.submit("INSERT INTO children (parent_id) VALUES (?)", ("missing",)).result(timeout=5)
+
+    assert writer.submit("INSERT INTO parents (id) VALUES (?)", ("a",)).result(timeout=5) == 1
+    assert database.parents() == ["a"]
+
+
+def test_returning_resolves_to_rows_and_other_writes_to_rowcount(database, writer):
+    inserted = writer.submit("INSERT INTO parents (id) VALUES ('a'), ('b') RETURNING id")
+    updated = writer.submit("UPDATE parents SET id = id || '1' WHERE id IN ('a', 'b')")
+    unchanged = writer.submit("DELETE FROM parents WHERE id = ?", ("zzz",))
+
+    assert sorted(inserted.result(timeout=5)) == [("a",), ("b",)]
+    assert updated.result(timeout=5) == 2
+    assert unchanged.result(timeout=5) == 0